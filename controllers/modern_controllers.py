@@ -2,217 +2,424 @@
 Controladores modernos seguindo princípios SOLID
 Separação de responsabilidades entre validação, lógica de negócio e resposta
 """
-from typing import Dict, List, Optional, Any
+import asyncio
+import functools
+import hashlib
+import html
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Annotated, Dict, List, Literal, Optional, Any, get_args
 from fastapi import HTTPException, Request
-from pydantic import BaseModel, Field, validator
-from enum import Enum
+from fastapi.responses import HTMLResponse, Response
+from pydantic import BeforeValidator
+from jinja2 import FileSystemBytecodeCache
 
-from services.service_manager import ServiceManager
+from services.service_manager import CircuitOpenError, ServiceManager
 from interfaces.service_interfaces import DataSourceStatus
+from utils.concurrency import AsyncTTLCache, SingleFlight
+from utils.serialization import dumps
 
+logger = logging.getLogger(__name__)
 
-class Region(str, Enum):
-    """Enum para regiões suportadas"""
-    US = "US"
-    BR = "BR"
-    ALL = "all"
 
+# Regiões suportadas
+Region = Literal["US", "BR", "all"]
 
-class CryptoOrderBy(str, Enum):
-    """Enum para ordenação de criptomoedas"""
-    PERCENT_CHANGE_24H = "percent_change_24h"
-    MARKET_CAP = "market_cap"
-    VOLUME = "volume"
-    PRICE = "price"
+# Região das tabelas HTMX: normalizada para maiúsculas antes de validar,
+# assim ?region=us continua funcionando
+HTMXRegion = Annotated[Literal["US", "BR"], BeforeValidator(str.upper)]
 
+# Ordenação para criptomoedas
+CryptoOrderBy = Literal["percent_change_24h", "market_cap", "volume", "price"]
 
-class StockRequest(BaseModel):
-    """Modelo de validação para requisições de ações"""
-    symbol: str = Field(..., min_length=1, max_length=20, description="Símbolo da ação")
-    
-    @validator('symbol')
-    def validate_symbol(cls, v):
-        return v.upper().strip()
+_REGIONS = frozenset(get_args(Region))
+_CRYPTO_ORDERS = frozenset(get_args(CryptoOrderBy))
+
+# Fragmentos HTMX de erro: corpo e cabeçalhos constantes, resposta nova por
+# requisição (o FastAPI altera o objeto Response devolvido)
+_NO_STORE = {"Cache-Control": "no-store"}
+_ERR_RATE_LIMIT_BODY = (
+    "<div class='error'>Muitas requisições. Tente novamente em alguns segundos.</div>"
+).encode()
+
+
+def _error_fragment(message: str) -> HTMLResponse:
+    """Fragmento HTMX de erro com a mensagem escapada"""
+    return HTMLResponse(
+        f"<div class='error'>{html.escape(message)}</div>",
+        headers=_NO_STORE
+    )
 
 
-class MultipleStocksRequest(BaseModel):
+# Protótipos de contexto dos partials HTMX, copiados a cada render
+_STOCKS_CTX_PROTO = {region: {"region": region} for region in ("US", "BR")}
+_CRYPTOS_CTX_PROTO = {order: {"order_by": order} for order in _CRYPTO_ORDERS}
+
+# Sufixos das chaves de rate limit, pré-codificados por endpoint
+_RL_SUFFIX = {
+    name: (":" + name).encode()
+    for name in (
+        "get_stock", "get_multiple_stocks", "get_trending_stocks",
+        "get_crypto", "get_trending_cryptos",
+        "htmx_stocks", "htmx_cryptos", "admin",
+    )
+}
+
+
+@dataclass(slots=True)
+class MultipleStocksRequest:
     """Modelo de validação para múltiplas ações"""
-    symbols: str = Field(..., description="Símbolos separados por vírgula")
-    
-    @validator('symbols')
-    def validate_symbols(cls, v):
-        symbols = [s.strip().upper() for s in v.split(",") if s.strip()]
+    raw_symbols: str
+    symbols: List[str] = field(init=False)
+
+    def __post_init__(self):
+        symbols = [s.strip().upper() for s in self.raw_symbols.split(",") if s.strip()]
         if len(symbols) == 0:
-            raise ValueError("Pelo menos um símbolo deve ser fornecido")
+            raise HTTPException(status_code=422, detail="Pelo menos um símbolo deve ser fornecido")
         if len(symbols) > 20:
-            raise ValueError("Máximo de 20 símbolos por vez")
-        return ",".join(symbols)
+            raise HTTPException(status_code=422, detail="Máximo de 20 símbolos por vez")
+        self.symbols = symbols
 
 
-class TrendingStocksRequest(BaseModel):
+@dataclass(slots=True)
+class TrendingStocksRequest:
     """Modelo de validação para ações em alta"""
-    limit: int = Field(10, ge=1, le=50, description="Número de ações a retornar")
-    region: Region = Field(Region.US, description="Região do mercado")
-
+    limit: int = 10
+    region: Region = "US"
 
-class CryptoRequest(BaseModel):
-    """Modelo de validação para requisições de criptomoedas"""
-    symbol: str = Field(..., min_length=1, max_length=20, description="Símbolo da criptomoeda")
-    
-    @validator('symbol')
-    def validate_symbol(cls, v):
-        return v.upper().strip()
+    def __post_init__(self):
+        if not 1 <= self.limit <= 50:
+            raise HTTPException(status_code=422, detail="limit deve estar entre 1 e 50")
+        if self.region not in _REGIONS:
+            raise HTTPException(status_code=422, detail=f"region deve ser um de: {sorted(_REGIONS)}")
 
 
-class TrendingCryptosRequest(BaseModel):
+@dataclass(slots=True)
+class TrendingCryptosRequest:
     """Modelo de validação para criptomoedas em alta"""
-    limit: int = Field(10, ge=1, le=50, description="Número de criptomoedas a retornar")
-    order_by: CryptoOrderBy = Field(CryptoOrderBy.PERCENT_CHANGE_24H, description="Ordenação")
+    limit: int = 10
+    order_by: CryptoOrderBy = "percent_change_24h"
+
+    def __post_init__(self):
+        if not 1 <= self.limit <= 50:
+            raise HTTPException(status_code=422, detail="limit deve estar entre 1 e 50")
+        if self.order_by not in _CRYPTO_ORDERS:
+            raise HTTPException(status_code=422, detail=f"order_by deve ser um de: {sorted(_CRYPTO_ORDERS)}")
+
+
+def handle_service_errors(service_name: str):
+    """Decorator: repassa HTTPException e converte demais erros via _handle_service_error"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            try:
+                return await func(self, *args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise self._handle_service_error(service_name, e)
+        return wrapper
+    return decorator
+
+
+def _worker_count() -> int:
+    """Workers do uvicorn em execução (ele lê o mesmo WEB_CONCURRENCY)"""
+    try:
+        return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        return 1
+
+
+class _UncachedTrending(Exception):
+    """Resultado de trending que não deve ser armazenado no cache"""
+
+    def __init__(self, rows: tuple):
+        super().__init__("trending sem dados reais")
+        self.rows = rows
 
 
 class BaseController:
     """Controlador base com funcionalidades comuns"""
     
+    # Rate limit padrão: requisições permitidas por janela (segundos)
+    RATE_LIMIT = 60
+    RATE_WINDOW = 60
+    
+    # Buckets locais mantidos por worker (LRU); chaves além disso são descartadas
+    LOCAL_BUCKETS_MAX = 10_000
+    
     def __init__(self, service_manager: ServiceManager):
         self.service_manager = service_manager
+        # Token bucket local por chave: (último refill monotônico, tokens)
+        self._local_buckets: "OrderedDict[bytes, tuple[float, float]]" = OrderedDict()
+        # Com limiter por processo cada worker aplica o limite inteiro; só um
+        # limiter compartilhado divide o orçamento entre os workers do uvicorn
+        workers = _worker_count() if service_manager.rate_limiter.shared else 1
+        self._local_limit = max(1, math.ceil(self.RATE_LIMIT / workers))
+        # Requisições simultâneas pelo mesmo símbolo compartilham uma busca
+        self._inflight = SingleFlight()
+    
+    # Listas de trending mudam devagar: cache de 60s compartilhado entre os
+    # controladores JSON e HTMX, chaveado por (tipo, filtro, limite)
+    _trending_cache = AsyncTTLCache(maxsize=32, ttl=60)
+    
+    # Combinações consultadas pelo dashboard, mantidas aquecidas em segundo
+    # plano; o intervalo fica abaixo do TTL para nunca expirarem
+    TRENDING_HOT_SET = (
+        ("stocks", "US", 10),
+        ("stocks", "BR", 10),
+        ("cryptos", "percent_change_24h", 10),
+    )
+    TRENDING_REFRESH_INTERVAL = 50
+    
+    async def _load_trending(self, key: tuple) -> tuple:
+        """Busca trending no serviço; linhas somente leitura, pois o cache as compartilha"""
+        kind, option, limit = key
+        if kind == "stocks":
+            data = await self.service_manager.get_trending_stocks(region=option, limit=limit)
+        else:
+            data = await self.service_manager.get_trending_cryptos(limit=limit, order_by=option)
+        rows = tuple(MappingProxyType(dict(item)) for item in data or ())
+        # Lista vazia ou dados de exemplo (fallback) não vão para o cache
+        if not rows or any(row.get("is_sample_data") for row in rows):
+            raise _UncachedTrending(rows)
+        return rows
+    
+    async def _get_trending(self, key: tuple) -> tuple:
+        try:
+            return await self._trending_cache.get_or_load(key, lambda: self._load_trending(key))
+        except _UncachedTrending as e:
+            return e.rows
+    
+    async def _cached_trending_stocks(self, region: str, limit: int) -> tuple:
+        """Ações em alta com cache"""
+        return await self._get_trending(("stocks", region, limit))
+    
+    async def _cached_trending_cryptos(self, limit: int, order_by: str) -> tuple:
+        """Criptos em alta com cache"""
+        return await self._get_trending(("cryptos", order_by, limit))
+    
+    async def refresh_trending(self) -> None:
+        """Recarrega no cache as combinações de trending mais usadas"""
+        for key in self.TRENDING_HOT_SET:
+            try:
+                await self._trending_cache.refresh(key, lambda: self._load_trending(key))
+            except Exception as e:
+                logger.warning("Falha ao aquecer trending %s: %s", key, e)
+    
+    async def run_trending_refresher(self) -> None:
+        """Loop de aquecimento do cache de trending (executar como task)"""
+        while True:
+            await self.refresh_trending()
+            await asyncio.sleep(self.TRENDING_REFRESH_INTERVAL)
+    
+    # Corpo JSON já serializado por chave de trending: (dados de origem, bytes, ETag)
+    _trending_bodies: Dict[tuple, tuple] = {}
+    
+    # Clientes e proxies podem reaproveitar a resposta por alguns segundos
+    TRENDING_MAX_AGE = 15
+    
+    def _trending_json_response(
+        self, key: tuple, data: tuple, if_none_match: Optional[str] = None
+    ) -> Response:
+        """Resposta JSON com bytes reaproveitados enquanto os dados em cache não mudam"""
+        cached = self._trending_bodies.get(key)
+        if cached is None or cached[0] is not data:
+            body = dumps(
+                self.service_manager.response_formatter.format_success_response(data)
+            )
+            etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+            cached = self._trending_bodies[key] = (data, body, etag)
+        
+        _, body, etag = cached
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.TRENDING_MAX_AGE}"
+        }
+        
+        # GET condicional: o cliente já tem esta versão
+        if if_none_match and (
+            if_none_match.strip() == "*"
+            or etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+        ):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(body, media_type="application/json", headers=headers)
+    
+    # (trecho em minúsculas, status HTTP, mensagem) - avaliados em ordem
+    _ERROR_RULES = (
+        ("429", 429, "Muitas requisições para {service}. Tente novamente em alguns segundos."),
+        ("rate limit", 429, "Muitas requisições para {service}. Tente novamente em alguns segundos."),
+        ("not found", 404, "Recurso não encontrado"),
+    )
     
     def _handle_service_error(self, service_name: str, error: Exception) -> HTTPException:
         """Converte erros de serviço em HTTPException apropriada"""
-        error_msg = str(error)
-        
-        if "Circuit breaker is open" in error_msg:
+        if isinstance(error, CircuitOpenError):
             return HTTPException(
                 status_code=503,
                 detail=f"Serviço {service_name} temporariamente indisponível. Tente novamente em alguns minutos."
             )
-        elif "429" in error_msg or "rate limit" in error_msg.lower():
-            return HTTPException(
-                status_code=429,
-                detail=f"Muitas requisições para {service_name}. Tente novamente em alguns segundos."
-            )
-        elif "not found" in error_msg.lower():
-            return HTTPException(
-                status_code=404,
-                detail="Recurso não encontrado"
-            )
-        else:
-            return HTTPException(
-                status_code=500,
-                detail=f"Erro interno no serviço {service_name}"
-            )
+        
+        error_msg = str(error).casefold()
+        
+        for needle, status_code, detail in self._ERROR_RULES:
+            if needle in error_msg:
+                return HTTPException(
+                    status_code=status_code,
+                    detail=detail.format(service=service_name)
+                )
+        
+        return HTTPException(
+            status_code=500,
+            detail=f"Erro interno no serviço {service_name}"
+        )
+    
+    def _consume_local_token(self, key: bytes, limit: int, window: int) -> bool:
+        """Consome um token do bucket local; False quando o bucket está vazio"""
+        buckets = self._local_buckets
+        now = time.monotonic()
+        last_refill, tokens = buckets.get(key, (now, float(limit)))
+        tokens = min(float(limit), tokens + (now - last_refill) * limit / window)
+        
+        allowed = tokens >= 1.0
+        buckets[key] = (now, tokens - 1.0 if allowed else tokens)
+        buckets.move_to_end(key)
+        if len(buckets) > self.LOCAL_BUCKETS_MAX:
+            buckets.popitem(last=False)
+        
+        return allowed
     
-    async def _check_rate_limit(self, client_ip: str, endpoint: str) -> bool:
+    async def _check_rate_limit(self, client_ip: bytes, endpoint: str) -> bool:
         """Verifica rate limiting por IP e endpoint"""
-        key = f"{client_ip}:{endpoint}"
-        return await self.service_manager.rate_limiter.is_allowed(key, 60, 60)  # 60 req/min
+        key = client_ip + _RL_SUFFIX[endpoint]
+        
+        # Caminho rápido: bucket local vazio rejeita sem consultar o limiter
+        if not self._consume_local_token(key, self._local_limit, self.RATE_WINDOW):
+            return False
+        
+        # Toda requisição aceita localmente também é contada no limiter
+        return await self.service_manager.rate_limiter.is_allowed(
+            key, self.RATE_LIMIT, self.RATE_WINDOW
+        )
 
 
 class StockController(BaseController):
     """Controlador para operações de ações"""
     
-    async def get_stock(self, request: StockRequest, client_ip: str) -> Dict[str, Any]:
+    @handle_service_errors("stock")
+    async def get_stock(self, symbol: str, client_ip: bytes) -> Dict[str, Any]:
         """Busca dados de uma ação específica"""
-        try:
-            # Rate limiting
-            if not await self._check_rate_limit(client_ip, "get_stock"):
-                raise HTTPException(status_code=429, detail="Rate limit excedido")
-            
-            data = await self.service_manager.get_stock_data(request.symbol)
-            
-            if not data:
-                raise HTTPException(status_code=404, detail=f"Ação {request.symbol} não encontrada")
-            
-            return self.service_manager.response_formatter.format_success_response(data)
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise self._handle_service_error("stock", e)
+        # Rate limiting
+        if not await self._check_rate_limit(client_ip, "get_stock"):
+            raise HTTPException(status_code=429, detail="Rate limit excedido")
+        
+        symbol = symbol.upper().strip()
+        if not symbol:
+            raise HTTPException(status_code=422, detail="Símbolo deve ter entre 1 e 20 caracteres")
+        
+        self.service_manager.check_circuit("stock_service")
+        data = await self._inflight.do(
+            symbol,
+            lambda: self.service_manager.get_stock_data(symbol)
+        )
+        
+        if not data:
+            raise HTTPException(status_code=404, detail=f"Ação {symbol} não encontrada")
+        
+        return self.service_manager.response_formatter.format_success_response(data)
     
-    async def get_multiple_stocks(self, request: MultipleStocksRequest, client_ip: str) -> Dict[str, Any]:
+    @handle_service_errors("stock")
+    async def get_multiple_stocks(self, request: MultipleStocksRequest, client_ip: bytes) -> Dict[str, Any]:
         """Busca dados de múltiplas ações"""
-        try:
-            # Rate limiting
-            if not await self._check_rate_limit(client_ip, "get_multiple_stocks"):
-                raise HTTPException(status_code=429, detail="Rate limit excedido")
-            
-            symbol_list = request.symbols.split(",")
-            data = await self.service_manager.stock_service.get_multiple_stocks(symbol_list)
-            
-            return self.service_manager.response_formatter.format_success_response(data)
-            
-        except Exception as e:
-            raise self._handle_service_error("stock", e)
+        # Rate limiting
+        if not await self._check_rate_limit(client_ip, "get_multiple_stocks"):
+            raise HTTPException(status_code=429, detail="Rate limit excedido")
+        
+        data = await self.service_manager.stock_service.get_multiple_stocks(request.symbols)
+        
+        return self.service_manager.response_formatter.format_success_response(data)
     
-    async def get_trending_stocks(self, request: TrendingStocksRequest, client_ip: str) -> Dict[str, Any]:
+    @handle_service_errors("stock")
+    async def get_trending_stocks(
+        self, request: TrendingStocksRequest, client_ip: bytes, if_none_match: Optional[str] = None
+    ) -> Response:
         """Busca ações em alta por região"""
-        try:
-            # Rate limiting
-            if not await self._check_rate_limit(client_ip, "get_trending_stocks"):
-                raise HTTPException(status_code=429, detail="Rate limit excedido")
-            
-            data = await self.service_manager.get_trending_stocks(
-                region=request.region.value,
-                limit=request.limit
-            )
-            
-            return self.service_manager.response_formatter.format_success_response(data)
-            
-        except Exception as e:
-            raise self._handle_service_error("stock", e)
+        # Rate limiting
+        if not await self._check_rate_limit(client_ip, "get_trending_stocks"):
+            raise HTTPException(status_code=429, detail="Rate limit excedido")
+        
+        # Sem check_circuit antes: com o breaker aberto o cache ainda responde,
+        # e só um miss chega a _execute_with_circuit_breaker (que falha rápido)
+        data = await self._cached_trending_stocks(request.region, request.limit)
+        
+        return self._trending_json_response(
+            ("stocks", request.region, request.limit), data, if_none_match
+        )
 
 
 class CryptoController(BaseController):
     """Controlador para operações de criptomoedas"""
     
-    async def get_crypto(self, request: CryptoRequest, client_ip: str) -> Dict[str, Any]:
+    @handle_service_errors("crypto")
+    async def get_crypto(self, symbol: str, client_ip: bytes) -> Dict[str, Any]:
         """Busca dados de uma criptomoeda específica"""
-        try:
-            # Rate limiting
-            if not await self._check_rate_limit(client_ip, "get_crypto"):
-                raise HTTPException(status_code=429, detail="Rate limit excedido")
-            
-            data = await self.service_manager.get_crypto_data(request.symbol)
-            
-            if not data:
-                raise HTTPException(status_code=404, detail=f"Criptomoeda {request.symbol} não encontrada")
-            
-            return self.service_manager.response_formatter.format_success_response(data)
-            
-        except HTTPException:
-            raise
-        except Exception as e:
-            raise self._handle_service_error("crypto", e)
+        # Rate limiting
+        if not await self._check_rate_limit(client_ip, "get_crypto"):
+            raise HTTPException(status_code=429, detail="Rate limit excedido")
+        
+        symbol = symbol.upper().strip()
+        if not symbol:
+            raise HTTPException(status_code=422, detail="Símbolo deve ter entre 1 e 20 caracteres")
+        
+        self.service_manager.check_circuit("crypto_service")
+        data = await self._inflight.do(
+            symbol,
+            lambda: self.service_manager.get_crypto_data(symbol)
+        )
+        
+        if not data:
+            raise HTTPException(status_code=404, detail=f"Criptomoeda {symbol} não encontrada")
+        
+        return self.service_manager.response_formatter.format_success_response(data)
     
-    async def get_trending_cryptos(self, request: TrendingCryptosRequest, client_ip: str) -> Dict[str, Any]:
+    @handle_service_errors("crypto")
+    async def get_trending_cryptos(
+        self, request: TrendingCryptosRequest, client_ip: bytes, if_none_match: Optional[str] = None
+    ) -> Response:
         """Busca criptomoedas em alta"""
-        try:
-            # Rate limiting
-            if not await self._check_rate_limit(client_ip, "get_trending_cryptos"):
-                raise HTTPException(status_code=429, detail="Rate limit excedido")
-            
-            data = await self.service_manager.get_trending_cryptos(
-                limit=request.limit,
-                order_by=request.order_by.value
-            )
-            
-            return self.service_manager.response_formatter.format_success_response(data)
-            
-        except Exception as e:
-            raise self._handle_service_error("crypto", e)
+        # Rate limiting
+        if not await self._check_rate_limit(client_ip, "get_trending_cryptos"):
+            raise HTTPException(status_code=429, detail="Rate limit excedido")
+        
+        data = await self._cached_trending_cryptos(request.limit, request.order_by)
+        
+        return self._trending_json_response(
+            ("cryptos", request.order_by, request.limit), data, if_none_match
+        )
 
 
 class AdminController(BaseController):
     """Controlador para operações administrativas"""
     
-    async def clear_cache(self, client_ip: str) -> Dict[str, Any]:
+    async def check_rate_limit(self, client_ip: bytes) -> None:
+        """Rate limiting mais restritivo para admin (usado como dependência da rota)"""
+        if not await self.service_manager.rate_limiter.is_allowed(
+            client_ip + _RL_SUFFIX["admin"], 10, 60
+        ):
+            raise HTTPException(status_code=429, detail="Rate limit excedido para operações admin")
+    
+    async def clear_cache(self) -> Dict[str, Any]:
         """Limpa todos os caches"""
         try:
-            # Rate limiting mais restritivo para admin
-            if not await self.service_manager.rate_limiter.is_allowed(f"{client_ip}:admin", 10, 60):
-                raise HTTPException(status_code=429, detail="Rate limit excedido para operações admin")
-            
             results = await self.service_manager.clear_all_caches()
+            self._trending_cache.clear()
+            self._trending_bodies.clear()
             
             return self.service_manager.response_formatter.format_success_response(
                 results,
@@ -222,13 +429,9 @@ class AdminController(BaseController):
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao limpar cache: {str(e)}")
     
-    async def get_cache_stats(self, client_ip: str) -> Dict[str, Any]:
+    async def get_cache_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas do cache"""
         try:
-            # Rate limiting
-            if not await self.service_manager.rate_limiter.is_allowed(f"{client_ip}:admin", 10, 60):
-                raise HTTPException(status_code=429, detail="Rate limit excedido para operações admin")
-            
             stats = {
                 "service_metrics": self.service_manager.get_service_metrics(),
                 "circuit_breakers": self.service_manager.get_circuit_breaker_status()
@@ -263,72 +466,72 @@ class AdminController(BaseController):
 class HTMXController(BaseController):
     """Controlador específico para requisições HTMX"""
     
+    # Partials renderizados pelos endpoints HTMX
+    PARTIALS = ("partials/new_stocks_table.html", "partials/crypto_table.html")
+    
+    # Teto de linhas das tabelas HTMX, aplicado aqui mesmo que a rota já valide
+    HTMX_MAX_LIMIT = 20
+    
     def __init__(self, service_manager: ServiceManager, templates):
         super().__init__(service_manager)
         self.templates = templates
+        
+        # Templates não mudam em produção: cache de bytecode em disco e sem
+        # checagem de mtime a cada render
+        self.templates.env.auto_reload = False
+        self.templates.env.bytecode_cache = FileSystemBytecodeCache()
+        
+        # Compilar os partials agora, não no primeiro request
+        for name in self.PARTIALS:
+            self.templates.get_template(name)
     
     async def htmx_trending_stocks(
         self,
         request: Request,
         limit: int = 10,
-        region: str = "US"
+        region: HTMXRegion = "US"
     ):
         """Endpoint HTMX para ações em alta"""
+        region = region.upper()
+        limit = min(limit, self.HTMX_MAX_LIMIT)
         try:
-            client_ip = request.client.host if request.client else "unknown"
+            client_ip = request.client.host.encode() if request.client else b"unknown"
             
             # Rate limiting
             if not await self._check_rate_limit(client_ip, "htmx_stocks"):
-                return "<div class='error'>Muitas requisições. Tente novamente em alguns segundos.</div>"
-            
-            stocks = await self.service_manager.get_trending_stocks(
-                region=region.upper(),
-                limit=min(limit, 20)
-            )
+                return HTMLResponse(_ERR_RATE_LIMIT_BODY, headers=_NO_STORE)
             
-            # Adicionar flag para indicar se são dados de fallback
-            for stock in stocks:
-                if stock.get('is_sample_data'):
-                    stock['is_fallback'] = True
+            stocks = await self._cached_trending_stocks(region, limit)
             
-            return self.templates.TemplateResponse(
-                "partials/new_stocks_table.html",
-                {"request": request, "stocks": stocks, "region": region.upper()}
-            )
+            context = _STOCKS_CTX_PROTO[region].copy()
+            context["request"] = request
+            context["stocks"] = stocks
+            return self.templates.TemplateResponse("partials/new_stocks_table.html", context)
             
         except Exception as e:
-            error_msg = f"Erro ao carregar ações: {str(e)}"
-            return f"<div class='error'>{error_msg}</div>"
+            return _error_fragment(f"Erro ao carregar ações: {e}")
     
     async def htmx_trending_cryptos(
         self,
         request: Request,
         limit: int = 10,
-        order_by: str = "percent_change_24h"
+        order_by: CryptoOrderBy = "percent_change_24h"
     ):
         """Endpoint HTMX para criptomoedas em alta"""
+        limit = min(limit, self.HTMX_MAX_LIMIT)
         try:
-            client_ip = request.client.host if request.client else "unknown"
+            client_ip = request.client.host.encode() if request.client else b"unknown"
             
             # Rate limiting
             if not await self._check_rate_limit(client_ip, "htmx_cryptos"):
-                return "<div class='error'>Muitas requisições. Tente novamente em alguns segundos.</div>"
+                return HTMLResponse(_ERR_RATE_LIMIT_BODY, headers=_NO_STORE)
             
-            cryptos = await self.service_manager.get_trending_cryptos(
-                limit=min(limit, 20),
-                order_by=order_by
-            )
-            
-            # Adicionar flag para indicar se são dados de fallback
-            for crypto in cryptos:
-                if crypto.get('is_sample_data'):
-                    crypto['is_fallback'] = True
+            cryptos = await self._cached_trending_cryptos(limit, order_by)
             
-            return self.templates.TemplateResponse(
-                "partials/crypto_table.html",
-                {"request": request, "cryptos": cryptos, "order_by": order_by}
-            )
+            context = _CRYPTOS_CTX_PROTO[order_by].copy()
+            context["request"] = request
+            context["cryptos"] = cryptos
+            return self.templates.TemplateResponse("partials/crypto_table.html", context)
             
         except Exception as e:
-            error_msg = f"Erro ao carregar criptomoedas: {str(e)}"
-            return f"<div class='error'>{error_msg}</div>"
+            return _error_fragment(f"Erro ao carregar criptomoedas: {e}")
@@ -5,24 +5,90 @@ API moderna e otimizada com documentação automática
 from fastapi import FastAPI, HTTPException, Query, Path, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Optional, Union
+from fastapi.middleware.gzip import GZipMiddleware
+from jinja2 import FileSystemBytecodeCache
+from pydantic import AfterValidator, BaseModel, Field, StringConstraints
+from typing import Annotated, List, Dict, Optional, Union
 import asyncio
-from datetime import datetime
+import html
 import uvicorn
 
 # Importar serviços otimizados
 from services.optimized_stock_service import OptimizedStockService
 from services.optimized_crypto_service import OptimizedCryptoService
+from services.cache_manager import RedisCache
+from utils.concurrency import AsyncTTLCache, SingleFlight
+from utils.config import Config
+from utils.performance import iso_now
+from utils.serialization import FastJSONResponse, dumps
 
 # Modelos Pydantic para validação
+# Símbolo no path: validado e normalizado para maiúsculas durante o parsing
+SymbolPath = Annotated[
+    str,
+    StringConstraints(min_length=1, max_length=10, pattern=r"^[A-Za-z0-9.\-]+$"),
+    AfterValidator(str.upper)
+]
+
+# Envelope documentado no OpenAPI (via _API_DOCS); as rotas montam o JSON
+# diretamente, sem validação de resposta em tempo de execução
 class APIResponse(BaseModel):
     success: bool
     data: Optional[Union[Dict, List]] = None
     error: Optional[str] = None
-    timestamp: str = datetime.now().isoformat()
+    timestamp: str = Field(default_factory=iso_now)
+
+_API_DOCS = {200: {"model": APIResponse}}
+
+def _success_response(data) -> FastJSONResponse:
+    """Envelope de sucesso serializado direto pelo orjson (sem jsonable_encoder)"""
+    return FastJSONResponse({
+        "success": True,
+        "data": data,
+        "error": None,
+        "timestamp": iso_now()
+    })
+
+def _success_payload(data) -> bytes:
+    """Envelope de sucesso já em bytes, para guardar no cache compartilhado"""
+    return dumps({
+        "success": True,
+        "data": data,
+        "error": None,
+        "timestamp": iso_now()
+    })
+
+def _json_bytes_response(payload: bytes) -> Response:
+    return Response(content=payload, media_type="application/json")
+
+def _error_response(message: str, status_code: int = 500) -> FastJSONResponse:
+    """Envelope de erro no mesmo formato do APIResponse, sem passar pelo Pydantic"""
+    return FastJSONResponse({
+        "success": False,
+        "data": None,
+        "error": message,
+        "timestamp": iso_now()
+    }, status_code=status_code)
+
+def _trending_payload(data: List[Dict]) -> bytes:
+    """Envelope de sucesso para listas de trending, já em bytes JSON
+
+    Campos nulos (market_cap, volume...) são omitidos de cada item para
+    reduzir o payload.
+    """
+    rows = [
+        {key: value for key, value in item.items() if value is not None}
+        for item in data
+    ]
+    payload = dumps({
+        "success": True,
+        "data": rows,
+        "error": None,
+        "timestamp": iso_now()
+    })
+    return payload
 
 # Criar aplicação FastAPI
 app = FastAPI(
@@ -30,9 +96,19 @@ app = FastAPI(
     description="API moderna para rastreamento de ações e criptomoedas em tempo real",
     version="2.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=FastJSONResponse
 )
 
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """Erros levantados pelas rotas saem no envelope padrão da API"""
+    return _error_response(str(exc.detail), exc.status_code)
+
+# Compressão GZIP: payloads JSON/HTML repetitivos comprimem bem; nível 4
+# mantém o custo de CPU baixo
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -46,84 +122,170 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Templates não mudam em produção: sem checagem de mtime por render e
+# bytecode compilado em cache no disco (sobrevive a restarts/workers)
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+
+# Partials HTMX compilados no import; as rotas renderizam estes objetos
+# diretamente, sem nova busca no loader nem o wrapper TemplateResponse
+_STOCKS_TPL = templates.get_template("partials/new_stocks_table.html")
+_CRYPTOS_TPL = templates.get_template("partials/crypto_table.html")
+_DASHBOARD_BODY_TPL = templates.get_template("partials/dashboard_body.html")
+
 # Inicializar serviços
 stock_service = OptimizedStockService()
 crypto_service = OptimizedCryptoService()
 
+# Requisições simultâneas pelo mesmo símbolo compartilham uma única busca
+_inflight = SingleFlight()
+
+# Trending muda na escala de minutos, mas o dashboard consulta a cada poucos
+# segundos: 15s frescos + 45s servindo o valor antigo enquanto revalida.
+# As rotas JSON guardam o payload já serializado; as HTMX guardam a lista
+_trending_cache = AsyncTTLCache(maxsize=32, ttl=15, stale_ttl=45)
+
+# Payloads serializados compartilhados entre os workers via Redis (se
+# REDIS_URL estiver definido); sem ele, fica só o cache local de cada processo
+_shared_cache = RedisCache.from_url(Config.REDIS_URL)
+
+async def _shared_get(key: str) -> Optional[bytes]:
+    if _shared_cache is None:
+        return None
+    return await _shared_cache.get(key)
+
+async def _shared_set(key: str, payload: bytes, ttl: int) -> None:
+    if _shared_cache is not None:
+        await _shared_cache.set(key, payload, ttl)
+
+async def _trending_stocks(limit: int, region: str) -> List[Dict]:
+    return await _trending_cache.get_or_load(
+        ("stocks", limit, region),
+        lambda: stock_service.get_trending_stocks(limit=limit, region=region)
+    )
+
+async def _trending_cryptos(limit: int, order_by: str) -> List[Dict]:
+    return await _trending_cache.get_or_load(
+        ("cryptos", limit, order_by),
+        lambda: crypto_service.get_trending_cryptos(limit=limit, order_by=order_by)
+    )
+
+async def _load_trending_stocks_payload(limit: int, region: str) -> bytes:
+    key = f"stock:trending:{region}:{limit}"
+    payload = await _shared_get(key)
+    if payload is None:
+        payload = _trending_payload(await stock_service.get_trending_stocks(limit=limit, region=region))
+        await _shared_set(key, payload, RedisCache.TTL_TRENDING)
+    return payload
+
+async def _load_trending_cryptos_payload(limit: int, order_by: str) -> bytes:
+    key = f"crypto:trending:{order_by}:{limit}"
+    payload = await _shared_get(key)
+    if payload is None:
+        payload = _trending_payload(await crypto_service.get_trending_cryptos(limit=limit, order_by=order_by))
+        await _shared_set(key, payload, RedisCache.TTL_TRENDING)
+    return payload
+
 # ============== ROTAS DO FRONTEND ==============
 
 @app.get("/", response_class=HTMLResponse)
 async def dashboard(request: Request):
     """Página principal do dashboard"""
-    return templates.TemplateResponse("dashboard_modern.html", {"request": request})
+    # Ações e criptos chegam juntas em /htmx/trending (uma requisição só)
+    return templates.TemplateResponse(
+        "dashboard_modern.html", {"request": request, "combined_trending": True}
+    )
 
 # ============== ROTAS DE AÇÕES ==============
 
-@app.get("/api/v2/stocks/{symbol}", response_model=APIResponse)
-async def get_stock(symbol: str = Path(..., description="Símbolo da ação (ex: AAPL, VALE3.SA)")):
+@app.get("/api/v2/stocks/{symbol}", responses=_API_DOCS)
+async def get_stock(symbol: Annotated[SymbolPath, Path(description="Símbolo da ação (ex: AAPL, VALE3.SA)")]):
     """Busca dados de uma ação específica"""
     try:
-        data = await stock_service.get_stock_data(symbol.upper())
+        key = "stock:" + symbol
+        payload = await _shared_get(key)
+        if payload is not None:
+            return _json_bytes_response(payload)
+        
+        data = await _inflight.do(key, lambda: stock_service.get_stock_data(symbol))
         
         if not data:
             raise HTTPException(status_code=404, detail=f"Ação {symbol} não encontrada")
         
-        return APIResponse(success=True, data=data)
+        payload = _success_payload(data)
+        await _shared_set(key, payload, RedisCache.TTL_STOCK)
+        return _json_bytes_response(payload)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
-@app.get("/api/v2/stocks", response_model=APIResponse)
+@app.get("/api/v2/stocks", responses=_API_DOCS)
 async def get_multiple_stocks(symbols: str = Query(..., description="Símbolos separados por vírgula")):
     """Busca dados de múltiplas ações"""
     try:
-        symbol_list = [s.strip().upper() for s in symbols.split(",")]
+        # Um upper/replace/split para a string toda; dict.fromkeys remove
+        # repetidos mantendo a ordem
+        symbol_list = list(dict.fromkeys(symbols.upper().replace(" ", "").split(",")))
+        
+        if not all(symbol_list):
+            raise HTTPException(status_code=400, detail="Lista de símbolos contém itens vazios")
         
         if len(symbol_list) > 20:
             raise HTTPException(status_code=400, detail="Máximo de 20 símbolos por vez")
         
         data = await stock_service.get_multiple_stocks(symbol_list)
-        return APIResponse(success=True, data=data)
+        return _success_response(data)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
-@app.get("/api/v2/stocks/trending", response_model=APIResponse)
+@app.get("/api/v2/stocks/trending", responses=_API_DOCS)
 async def get_trending_stocks(
     limit: int = Query(10, ge=1, le=50, description="Número de ações a retornar"),
     region: str = Query("US", description="Região do mercado (US ou BR)")
 ):
     """Busca ações em alta por região"""
     try:
-        data = await stock_service.get_trending_stocks(limit=limit, region=region.upper())
-        return APIResponse(success=True, data=data)
+        region = region.upper()
+        payload = await _trending_cache.get_or_load(
+            ("stocks-json", limit, region),
+            lambda: _load_trending_stocks_payload(limit, region)
+        )
+        return _json_bytes_response(payload)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
 # ============== ROTAS DE CRIPTOMOEDAS ==============
 
-@app.get("/api/v2/crypto/{symbol}", response_model=APIResponse)
-async def get_crypto(symbol: str = Path(..., description="Símbolo da criptomoeda (ex: BTC, ETH)")):
+@app.get("/api/v2/crypto/{symbol}", responses=_API_DOCS)
+async def get_crypto(symbol: Annotated[SymbolPath, Path(description="Símbolo da criptomoeda (ex: BTC, ETH)")]):
     """Busca dados de uma criptomoeda específica"""
     try:
-        data = await crypto_service.get_crypto_data(symbol.upper())
+        key = "crypto:" + symbol
+        payload = await _shared_get(key)
+        if payload is not None:
+            return _json_bytes_response(payload)
+        
+        data = await _inflight.do(key, lambda: crypto_service.get_crypto_data(symbol))
         
         if not data:
             raise HTTPException(status_code=404, detail=f"Criptomoeda {symbol} não encontrada")
         
-        return APIResponse(success=True, data=data)
+        payload = _success_payload(data)
+        await _shared_set(key, payload, RedisCache.TTL_CRYPTO)
+        return _json_bytes_response(payload)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
 
-@app.get("/api/v2/crypto/trending", response_model=APIResponse)
+@app.get("/api/v2/crypto/trending", responses=_API_DOCS)
 async def get_trending_cryptos(
     limit: int = Query(10, ge=1, le=50, description="Número de criptomoedas a retornar"),
     order_by: str = Query("percent_change_24h", description="Ordenação")
@@ -134,8 +296,11 @@ async def get_trending_cryptos(
         if order_by not in valid_orders:
             raise HTTPException(status_code=400, detail=f"order_by deve ser um de: {valid_orders}")
         
-        data = await crypto_service.get_trending_cryptos(limit=limit, order_by=order_by)
-        return APIResponse(success=True, data=data)
+        payload = await _trending_cache.get_or_load(
+            ("cryptos-json", limit, order_by),
+            lambda: _load_trending_cryptos_payload(limit, order_by)
+        )
+        return _json_bytes_response(payload)
         
     except HTTPException:
         raise
@@ -144,6 +309,14 @@ async def get_trending_cryptos(
 
 # ============== ROTAS HTMX PARA FRONTEND ==============
 
+HTMX_ERROR_TEMPLATE = "<div class='error'>Erro ao carregar {kind}: {message}</div>"
+
+def htmx_error(kind: str, error: Exception) -> HTMLResponse:
+    """Fragmento de erro para o swap do HTMX, com a mensagem escapada"""
+    return HTMLResponse(
+        HTMX_ERROR_TEMPLATE.format(kind=kind, message=html.escape(str(error)))
+    )
+
 @app.get("/htmx/stocks/trending")
 async def htmx_trending_stocks(
     request: Request,
@@ -152,15 +325,15 @@ async def htmx_trending_stocks(
 ):
     """Endpoint HTMX para ações em alta"""
     try:
-        stocks = await stock_service.get_trending_stocks(limit=limit, region=region.upper())
+        region = region.upper()
+        stocks = await _trending_stocks(limit, region)
         
-        return templates.TemplateResponse(
-            "partials/new_stocks_table.html",
-            {"request": request, "stocks": stocks, "region": region.upper()}
+        return HTMLResponse(
+            _STOCKS_TPL.render(request=request, stocks=stocks, region=region)
         )
         
     except Exception as e:
-        return f"<div class='error'>Erro ao carregar ações: {str(e)}</div>"
+        return htmx_error("ações", e)
 
 @app.get("/htmx/crypto/trending")
 async def htmx_trending_cryptos(
@@ -170,68 +343,163 @@ async def htmx_trending_cryptos(
 ):
     """Endpoint HTMX para criptomoedas em alta"""
     try:
-        cryptos = await crypto_service.get_trending_cryptos(limit=limit, order_by=order_by)
+        cryptos = await _trending_cryptos(limit, order_by)
+        
+        return HTMLResponse(
+            _CRYPTOS_TPL.render(request=request, cryptos=cryptos, order_by=order_by)
+        )
+        
+    except Exception as e:
+        return htmx_error("criptomoedas", e)
+
+@app.get("/htmx/trending")
+async def htmx_trending_all(
+    request: Request,
+    limit: int = Query(10, ge=1, le=20),
+    region: str = Query("US"),
+    order_by: str = Query("percent_change_24h")
+):
+    """Endpoint HTMX com ações e criptomoedas em alta em um único fragmento
+
+    A tabela de ações vai para o alvo da requisição e a de criptos para
+    #crypto-container via hx-swap-oob; as duas buscas rodam em paralelo.
+    """
+    try:
+        region = region.upper()
+        stocks, cryptos = await asyncio.gather(
+            _trending_stocks(limit, region),
+            _trending_cryptos(limit, order_by)
+        )
         
-        return templates.TemplateResponse(
-            "partials/crypto_table.html",
-            {"request": request, "cryptos": cryptos, "order_by": order_by}
+        return HTMLResponse(
+            _DASHBOARD_BODY_TPL.render(
+                request=request,
+                stocks=stocks,
+                region=region,
+                cryptos=cryptos,
+                order_by=order_by
+            )
         )
         
     except Exception as e:
-        return f"<div class='error'>Erro ao carregar criptomoedas: {str(e)}</div>"
+        return htmx_error("dados", e)
+
+# Corpo do health check pré-serializado; só muda quando o relógio de
+# resolução de segundos (iso_now) avança
+_health_body = {"timestamp": None, "payload": b""}
 
-@app.get("/api/v2/health", response_model=APIResponse)
+def _health_payload() -> bytes:
+    timestamp = iso_now()
+    if _health_body["timestamp"] != timestamp:
+        _health_body["payload"] = dumps({
+            "success": True,
+            "data": {
+                "status": "healthy",
+                "version": "2.0.0",
+                "timestamp": timestamp
+            },
+            "error": None,
+            "timestamp": timestamp
+        })
+        _health_body["timestamp"] = timestamp
+    return _health_body["payload"]
+
+@app.get("/api/v2/health", responses=_API_DOCS)
 async def health_check():
     """Health check da API"""
-    return APIResponse(
-        success=True,
-        data={
-            "status": "healthy",
-            "version": "2.0.0",
-            "timestamp": datetime.now().isoformat()
-        }
-    )
+    return Response(content=_health_payload(), media_type="application/json")
+
+class HealthProbeMiddleware:
+    """Responde GET/HEAD /api/v2/health antes do roteamento do Starlette
+
+    Probes de load balancer são o tráfego mais frequente; a rota acima fica
+    apenas para a documentação do OpenAPI.
+    """
+
+    PATH = "/api/v2/health"
 
-@app.post("/api/v2/admin/cache/clear", response_model=APIResponse)
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"] != self.PATH
+            or scope["method"] not in ("GET", "HEAD")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        payload = _health_payload()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(payload)).encode()),
+            ],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": payload if scope["method"] == "GET" else b"",
+        })
+
+# Middleware mais externo: não passa por CORS/GZip nem pelo router
+app.add_middleware(HealthProbeMiddleware)
+
+@app.post("/api/v2/admin/cache/clear", responses=_API_DOCS)
 async def clear_cache():
     """Limpa o cache dos serviços"""
     try:
         stock_service.clear_cache()
         crypto_service.clear_cache()
+        _trending_cache.clear()
+        if _shared_cache is not None:
+            await _shared_cache.clear()
         
-        return APIResponse(
-            success=True,
-            data={"message": "Cache limpo com sucesso"}
-        )
+        return _success_response({"message": "Cache limpo com sucesso"})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao limpar cache: {str(e)}")
 
-@app.get("/api/v2/admin/cache/stats", response_model=APIResponse)
+@app.get("/api/v2/admin/cache/stats", responses=_API_DOCS)
 async def get_cache_stats():
     """Retorna estatísticas do cache"""
     try:
         stock_stats = stock_service.get_cache_stats()
         crypto_stats = crypto_service.get_cache_stats()
         
-        return APIResponse(
-            success=True,
-            data={
-                "stock_cache": stock_stats,
-                "crypto_cache": crypto_stats
-            }
-        )
+        return _success_response({
+            "stock_cache": stock_stats,
+            "crypto_cache": crypto_stats,
+            "shared_cache": await _shared_cache.get_stats() if _shared_cache else None
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erro ao obter estatísticas: {str(e)}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Fecha o pool de conexões do cache compartilhado"""
+    if _shared_cache is not None:
+        await _shared_cache.close()
+
 # ============== EXECUTAR APLICAÇÃO ==============
 
 if __name__ == "__main__":
+    # uvloop + httptools (uvicorn[standard]); com reload (apenas em
+    # desenvolvimento) o uvicorn roda um único processo. Em produção, sem
+    # access log por request e sem os cabeçalhos Server/Date
     uvicorn.run(
-        "new_fastapi_app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
+        "fixed_fastapi_app:app",
+        host=Config.FASTAPI_HOST,
+        port=Config.FASTAPI_PORT,
+        loop="uvloop",
+        http="httptools",
+        reload=Config.FASTAPI_RELOAD,
+        workers=1 if Config.FASTAPI_RELOAD else Config.FASTAPI_WORKERS,
+        access_log=not Config.IS_PRODUCTION,
+        server_header=not Config.IS_PRODUCTION,
+        date_header=not Config.IS_PRODUCTION,
+        log_level="warning" if Config.IS_PRODUCTION else "info"
     )
@@ -134,18 +134,21 @@ class IResponseFormatter(ABC):
 class IRateLimiter(ABC):
     """Interface para limitador de taxa"""
     
+    # True quando o estado é compartilhado entre processos (ex.: Redis)
+    shared: bool = False
+    
     @abstractmethod
-    async def is_allowed(self, key: str, limit: int, window: int) -> bool:
+    async def is_allowed(self, key: str | bytes, limit: int, window: int) -> bool:
         """Verifica se requisição é permitida"""
         pass
     
     @abstractmethod
-    async def get_remaining(self, key: str, limit: int, window: int) -> int:
+    async def get_remaining(self, key: str | bytes, limit: int, window: int) -> int:
         """Retorna requisições restantes"""
         pass
     
     @abstractmethod
-    async def reset(self, key: str) -> bool:
+    async def reset(self, key: str | bytes) -> bool:
         """Reseta contador para uma chave"""
         pass
 
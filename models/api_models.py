@@ -7,7 +7,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, computed_field, model_validator
 
 
 class CurrencyType(str, Enum):
@@ -43,9 +43,6 @@ class StockResponse(BaseModel):
     name: str = Field(..., description='Nome da empresa')
     price: float = Field(..., description='Preço atual')
     previous_close: float = Field(..., description='Fechamento anterior')
-    change_amount: Optional[float] = Field(
-        None, description='Mudança em valor absoluto'
-    )
     change_percent: Optional[float] = Field(
         None, description='Mudança percentual'
     )
@@ -53,35 +50,25 @@ class StockResponse(BaseModel):
         None, description='Capitalização de mercado'
     )
     volume: Optional[int] = Field(None, description='Volume de negociação')
-    is_gaining: bool = Field(..., description='Se está em alta')
     last_updated: datetime = Field(..., description='Última atualização')
 
-    @validator('change_amount', pre=True, always=True)
-    def calculate_change_amount(cls, v, values):
-        if v is None and 'price' in values and 'previous_close' in values:
-            return values['price'] - values['previous_close']
-        return v
-
-    @validator('change_percent', pre=True, always=True)
-    def calculate_change_percent(cls, v, values):
-        if v is None and 'price' in values and 'previous_close' in values:
-            if values['previous_close'] > 0:
-                return (
-                    (values['price'] - values['previous_close'])
-                    / values['previous_close']
-                ) * 100
-        return v
-
-    @validator('is_gaining', pre=True, always=True)
-    def calculate_is_gaining(cls, v, values):
-        if 'change_amount' in values:
-            return values['change_amount'] > 0
-        if 'price' in values and 'previous_close' in values:
-            return values['price'] > values['previous_close']
-        return False
-
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat()}
+    @model_validator(mode='after')
+    def fill_change_percent(self):
+        if self.change_percent is None and self.previous_close > 0:
+            self.change_percent = (
+                (self.price - self.previous_close) / self.previous_close
+            ) * 100
+        return self
+
+    @computed_field(description='Mudança em valor absoluto')
+    @property
+    def change_amount(self) -> float:
+        return self.price - self.previous_close
+
+    @computed_field(description='Se está em alta')
+    @property
+    def is_gaining(self) -> bool:
+        return self.price > self.previous_close
 
 
 class CryptoResponse(BaseModel):
@@ -91,9 +78,6 @@ class CryptoResponse(BaseModel):
     name: str = Field(..., description='Nome da criptomoeda')
     price: float = Field(..., description='Preço atual')
     previous_close: float = Field(..., description='Preço anterior (24h)')
-    change_amount: Optional[float] = Field(
-        None, description='Mudança em valor absoluto'
-    )
     change_percent_24h: Optional[float] = Field(
         None, description='Mudança percentual 24h'
     )
@@ -101,35 +85,25 @@ class CryptoResponse(BaseModel):
         None, description='Capitalização de mercado'
     )
     volume_24h: Optional[float] = Field(None, description='Volume 24h')
-    is_gaining: bool = Field(..., description='Se está em alta')
     last_updated: datetime = Field(..., description='Última atualização')
 
-    @validator('change_amount', pre=True, always=True)
-    def calculate_change_amount(cls, v, values):
-        if v is None and 'price' in values and 'previous_close' in values:
-            return values['price'] - values['previous_close']
-        return v
-
-    @validator('change_percent_24h', pre=True, always=True)
-    def calculate_change_percent(cls, v, values):
-        if v is None and 'price' in values and 'previous_close' in values:
-            if values['previous_close'] > 0:
-                return (
-                    (values['price'] - values['previous_close'])
-                    / values['previous_close']
-                ) * 100
-        return v
-
-    @validator('is_gaining', pre=True, always=True)
-    def calculate_is_gaining(cls, v, values):
-        if 'change_amount' in values:
-            return values['change_amount'] > 0
-        if 'price' in values and 'previous_close' in values:
-            return values['price'] > values['previous_close']
-        return False
-
-    class Config:
-        json_encoders = {datetime: lambda v: v.isoformat()}
+    @model_validator(mode='after')
+    def fill_change_percent(self):
+        if self.change_percent_24h is None and self.previous_close > 0:
+            self.change_percent_24h = (
+                (self.price - self.previous_close) / self.previous_close
+            ) * 100
+        return self
+
+    @computed_field(description='Mudança em valor absoluto')
+    @property
+    def change_amount(self) -> float:
+        return self.price - self.previous_close
+
+    @computed_field(description='Se está em alta')
+    @property
+    def is_gaining(self) -> bool:
+        return self.price > self.previous_close
 
 
 class PortfolioItem(BaseModel):
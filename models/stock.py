@@ -1,9 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Stock:
     """Modelo para representar uma ação"""
 
@@ -15,15 +15,22 @@ class Stock:
     volume: Optional[int] = None
     change_percent: Optional[float] = None
     last_updated: Optional[datetime] = None
+    # Último to_dict() calculado; a instância é imutável, então nunca expira
+    _dict_cache: Optional[dict] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.last_updated is None:
-            self.last_updated = datetime.now()
+            object.__setattr__(self, 'last_updated', datetime.now())
 
         if self.change_percent is None and self.previous_close > 0:
-            self.change_percent = (
-                (self.price - self.previous_close) / self.previous_close
-            ) * 100
+            object.__setattr__(
+                self,
+                'change_percent',
+                ((self.price - self.previous_close) / self.previous_close)
+                * 100,
+            )
 
     @property
     def change_amount(self) -> float:
@@ -36,8 +43,11 @@ class Stock:
         return self.change_amount > 0
 
     def to_dict(self) -> dict:
-        """Converte o objeto para dicionário"""
-        return {
+        """Converte o objeto para dicionário (calculado uma única vez)"""
+        if self._dict_cache is not None:
+            return self._dict_cache
+
+        data = {
             'symbol': self.symbol,
             'name': self.name,
             'price': self.price,
@@ -51,9 +61,11 @@ class Stock:
             if self.last_updated
             else None,
         }
+        object.__setattr__(self, '_dict_cache', data)
+        return data
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Crypto:
     """Modelo para representar uma criptomoeda"""
 
@@ -65,15 +77,22 @@ class Crypto:
     volume_24h: Optional[float] = None
     change_percent_24h: Optional[float] = None
     last_updated: Optional[datetime] = None
+    # Último to_dict() calculado; a instância é imutável, então nunca expira
+    _dict_cache: Optional[dict] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         if self.last_updated is None:
-            self.last_updated = datetime.now()
+            object.__setattr__(self, 'last_updated', datetime.now())
 
         if self.change_percent_24h is None and self.previous_close > 0:
-            self.change_percent_24h = (
-                (self.price - self.previous_close) / self.previous_close
-            ) * 100
+            object.__setattr__(
+                self,
+                'change_percent_24h',
+                ((self.price - self.previous_close) / self.previous_close)
+                * 100,
+            )
 
     @property
     def change_amount(self) -> float:
@@ -86,8 +105,11 @@ class Crypto:
         return self.change_amount > 0
 
     def to_dict(self) -> dict:
-        """Converte o objeto para dicionário"""
-        return {
+        """Converte o objeto para dicionário (calculado uma única vez)"""
+        if self._dict_cache is not None:
+            return self._dict_cache
+
+        data = {
             'symbol': self.symbol,
             'name': self.name,
             'price': self.price,
@@ -101,3 +123,5 @@ class Crypto:
             if self.last_updated
             else None,
         }
+        object.__setattr__(self, '_dict_cache', data)
+        return data
@@ -2,16 +2,23 @@
 VmPro Mini Tracker - Arquitetura Moderna v3.0.0
 FastAPI Application seguindo princípios SOLID e Clean Architecture
 """
-from fastapi import FastAPI, HTTPException, Query, Path, Request, Depends
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Query, Path, Request
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from pydantic import BaseModel
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from jinja2 import FileSystemBytecodeCache
+from pydantic import BaseModel, Field
+from collections import OrderedDict
 from typing import List, Dict, Optional, Union
 import asyncio
-from datetime import datetime
+import html
+from contextlib import asynccontextmanager
+import functools
+import re
+import sys
+import time
 import uvicorn
 import logging
 
@@ -19,7 +26,11 @@ import logging
 from services.service_orchestrator import ServiceOrchestrator
 
 # Configuração
+from utils.concurrency import AsyncTTLCache
 from utils.config import Config
+from utils.performance import iso_now
+from utils.serialization import FastJSONResponse, dumps
+from utils.static_files import PrecompressedStaticFiles, precompress_directory
 
 # ============== LOGGING CONFIGURATION ==============
 
@@ -31,20 +42,166 @@ logger = logging.getLogger(__name__)
 
 # ============== RESPONSE MODELS ==============
 
+# Envelope documentado no OpenAPI (via API_DOCS); as rotas devolvem dicts
+# simples serializados pelo orjson, sem validação de resposta
 class APIResponse(BaseModel):
     success: bool
     data: Optional[Union[Dict, List]] = None
     error: Optional[str] = None
-    timestamp: str = datetime.now().isoformat()
+    timestamp: str = Field(default_factory=iso_now)
 
-# ============== DEPENDENCY INJECTION ==============
+API_DOCS = {200: {"model": APIResponse}}
 
-# Service Orchestrator Singleton
+# Valores aceitos nos filtros de trending (pertinência O(1), montados uma vez)
+VALID_CRYPTO_ORDERS = frozenset({"percent_change_24h", "market_cap", "volume", "price"})
+VALID_REGIONS = frozenset({"US", "BR"})
+
+def success_envelope(data, success: bool = True) -> Dict:
+    """Envelope de resposta da API com timestamp em cache por segundo"""
+    return {"success": success, "data": data, "error": None, "timestamp": iso_now()}
+
+def cached_json_response(payload: bytes) -> Response:
+    return Response(content=payload, media_type="application/json")
+
+def error_response(message: str, status_code: int) -> FastJSONResponse:
+    """Envelope de erro da API"""
+    return FastJSONResponse(
+        {"success": False, "data": None, "error": message, "timestamp": iso_now()},
+        status_code=status_code
+    )
+
+# ============== SERVICES ==============
+
+# Service Orchestrator Singleton, usado direto pelos handlers (sem Depends
+# resolvido a cada request)
 orchestrator = ServiceOrchestrator()
 
-def get_orchestrator() -> ServiceOrchestrator:
-    """Dependency provider para Service Orchestrator"""
-    return orchestrator
+# Trending: poucas combinações de parâmetros consultadas o tempo todo pelo
+# dashboard; 15s em memória, com buscas simultâneas da mesma chave coalescidas
+trending_cache = AsyncTTLCache(maxsize=64, ttl=15)
+
+class UncachedTrending(Exception):
+    """Trending com dados de exemplo (fallback): devolvido, mas não cacheado"""
+
+    def __init__(self, rows):
+        super().__init__("trending sem dados reais")
+        self.rows = rows
+
+async def load_trending(loader):
+    rows = await loader()
+    if not rows or any(row.get("is_sample_data") for row in rows):
+        raise UncachedTrending(rows)
+    return rows
+
+async def cached_trending(key: tuple, loader):
+    try:
+        return await trending_cache.get_or_load(key, lambda: load_trending(loader))
+    except UncachedTrending as e:
+        return e.rows
+
+async def cached_trending_stocks(limit: int, region: str):
+    return await cached_trending(
+        ("stocks", limit, region),
+        lambda: orchestrator.get_trending_stocks(limit=limit, region=region)
+    )
+
+async def cached_trending_cryptos(limit: int, order_by: str):
+    return await cached_trending(
+        ("cryptos", limit, order_by),
+        lambda: orchestrator.get_trending_cryptos(limit=limit, order_by=order_by)
+    )
+
+# Corpos JSON prontos de health (que consulta as fontes) e métricas; probes e
+# painéis frequentes reaproveitam os mesmos bytes dentro do TTL
+health_body_cache = AsyncTTLCache(maxsize=1, ttl=5)
+metrics_body_cache = AsyncTTLCache(maxsize=1, ttl=1)
+
+async def serialized_envelope(loader) -> bytes:
+    return dumps(success_envelope(await loader()))
+
+# Símbolos: formato validado antes de qualquer chamada às fontes, e 404s
+# recentes lembrados por 60s para que repetições não voltem à rede
+SYMBOL_RE = re.compile(r"^[A-Z0-9.\-]{1,12}$")
+NOT_FOUND_TTL = 60
+NOT_FOUND_MAXSIZE = 1024
+recent_not_found: "OrderedDict[str, float]" = OrderedDict()
+
+def normalize_symbol(symbol: str) -> str:
+    """Símbolo em maiúsculas; 400 se o formato for inválido"""
+    symbol = symbol.upper()
+    if not SYMBOL_RE.match(symbol):
+        raise HTTPException(status_code=400, detail="Símbolo inválido")
+    return symbol
+
+def is_recent_not_found(key: str) -> bool:
+    expires_at = recent_not_found.get(key)
+    if expires_at is None:
+        return False
+    if expires_at > time.monotonic():
+        return True
+    del recent_not_found[key]
+    return False
+
+def remember_not_found(key: str) -> None:
+    recent_not_found[key] = time.monotonic() + NOT_FOUND_TTL
+    recent_not_found.move_to_end(key)
+    while len(recent_not_found) > NOT_FOUND_MAXSIZE:
+        recent_not_found.popitem(last=False)
+
+# ============== ERROR HANDLING ==============
+
+def safe_endpoint(label: str, detail: str = "Erro interno do servidor"):
+    """Decorator: repassa HTTPException e converte demais erros em 500 com log"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.exception("Erro em %s: %s", label, e)
+                raise HTTPException(status_code=500, detail=detail)
+        return wrapper
+    return decorator
+
+# ============== LIFESPAN ==============
+
+def warm_static_assets():
+    """Pré-comprime estáticos alterados e compila os templates do hot path"""
+    precompress_directory("static")
+    for template_name in PRECOMPILED_TEMPLATES:
+        templates.get_template(template_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicialização e finalização da aplicação"""
+    logger.info("🚀 Iniciando VmPro Mini Tracker v3.0.0")
+    logger.info("📊 Arquitetura moderna com princípios SOLID ativada")
+    
+    # O app legado monta serviços e controllers próprios no import; carregado
+    # junto com este, duplica memória e pools de conexão
+    if "modern_fastapi_app_old" in sys.modules:
+        logger.warning("⚠️ modern_fastapi_app_old importado no mesmo processo: serviços duplicados")
+    
+    # Orchestrator e aquecimento de estáticos/templates (I/O de disco em
+    # thread) rodam em paralelo
+    try:
+        await asyncio.gather(
+            orchestrator.initialize(),
+            asyncio.to_thread(warm_static_assets)
+        )
+        logger.info("📈 Serviços iniciados: 2/2")
+    except Exception as e:
+        logger.exception("Erro na inicialização: %s", e)
+        raise
+    
+    # Schema OpenAPI gerado e serializado uma única vez
+    app.state.openapi_bytes = dumps(app.openapi())
+    
+    yield
+    
+    logger.info("🔴 Encerrando VmPro Mini Tracker v3.0.0")
 
 # ============== FASTAPI APPLICATION ==============
 
@@ -52,15 +209,19 @@ app = FastAPI(
     title="VmPro Mini Tracker API v3.0",
     description="API moderna e escalável para rastreamento de ações e criptomoedas",
     version="3.0.0",
-    docs_url="/api/docs",
-    redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    # Schema e páginas de documentação servidos pelas rotas de DOCS abaixo
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None,
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
 # ============== MIDDLEWARES ==============
 
-# Compressão GZIP
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compressão GZIP das respostas dinâmicas; nível 4 mantém o custo de CPU
+# baixo. Estáticos já saem pré-comprimidos (ver PrecompressedStaticFiles)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=4)
 
 # CORS configurado adequadamente
 app.add_middleware(
@@ -73,29 +234,39 @@ app.add_middleware(
 
 # ============== STATIC FILES & TEMPLATES ==============
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-# ============== EVENT HANDLERS ==============
+# Templates não mudam em produção: sem checagem de mtime por render e
+# bytecode compilado em cache no disco (sobrevive a restarts/workers)
+templates.env.auto_reload = False
+templates.env.bytecode_cache = FileSystemBytecodeCache()
 
-@app.on_event("startup")
-async def startup_event():
-    """Inicialização da aplicação"""
-    logger.info("🚀 Iniciando VmPro Mini Tracker v3.0.0")
-    logger.info("📊 Arquitetura moderna com princípios SOLID ativada")
-    
-    # Inicializar orchestrator
-    try:
-        await orchestrator.initialize()
-        logger.info("📈 Serviços iniciados: 2/2")
-    except Exception as e:
-        logger.error(f"Erro na inicialização: {e}")
-        raise
+# Compilados no startup (lifespan)
+PRECOMPILED_TEMPLATES = (
+    "dashboard_modern.html",
+)
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Limpeza na finalização da aplicação"""
-    logger.info("🔴 Encerrando VmPro Mini Tracker v3.0.0")
+# Partials HTMX compilados uma vez no import e renderizados direto
+STOCKS_TABLE_TEMPLATE = templates.get_template("partials/new_stocks_table.html")
+CRYPTO_TABLE_TEMPLATE = templates.get_template("partials/crypto_table.html")
+
+# ============== DOCS ==============
+
+OPENAPI_URL = "/api/openapi.json"
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_schema(request: Request):
+    """Schema OpenAPI pré-serializado no startup"""
+    return cached_json_response(request.app.state.openapi_bytes)
+
+@app.get("/api/docs", include_in_schema=False)
+async def swagger_docs():
+    return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=app.title + " - Swagger UI")
+
+@app.get("/api/redoc", include_in_schema=False)
+async def redoc_docs():
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=app.title + " - ReDoc")
 
 # ============== FRONTEND ROUTES ==============
 
@@ -106,214 +277,188 @@ async def dashboard(request: Request):
 
 # ============== API ROUTES - STOCKS ==============
 
-@app.get("/api/v3/stocks/{symbol}", response_model=APIResponse)
+@app.get("/api/v3/stocks/{symbol}", responses=API_DOCS)
+@safe_endpoint("busca de ação")
 async def get_stock(
-    symbol: str = Path(..., description="Símbolo da ação"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    symbol: str = Path(..., description="Símbolo da ação")
 ):
     """Busca dados de uma ação específica"""
-    try:
-        data = await orchestrator.get_stock_data(symbol.upper())
-        
-        if not data:
-            raise HTTPException(status_code=404, detail=f"Ação {symbol} não encontrada")
-        
-        return APIResponse(success=True, data=data)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao buscar ação {symbol}: {e}")
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    symbol = normalize_symbol(symbol)
+    key = "stock:" + symbol
+    data = None if is_recent_not_found(key) else await orchestrator.get_stock_data(symbol)
+    
+    if not data:
+        remember_not_found(key)
+        raise HTTPException(status_code=404, detail=f"Ação {symbol} não encontrada")
+    
+    return success_envelope(data)
 
-@app.get("/api/v3/stocks/trending", response_model=APIResponse)
+@app.get("/api/v3/stocks/trending", responses=API_DOCS)
+@safe_endpoint("trending stocks")
 async def get_trending_stocks(
     limit: int = Query(10, ge=1, le=50, description="Número de ações"),
-    region: str = Query("US", description="Região do mercado (US ou BR)"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    region: str = Query("US", description="Região do mercado (US ou BR)")
 ):
     """Busca ações em alta por região"""
-    try:
-        data = await orchestrator.get_trending_stocks(limit=limit, region=region.upper())
-        return APIResponse(success=True, data=data)
-        
-    except Exception as e:
-        logger.error(f"Erro ao buscar trending stocks: {e}")
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    region = region.upper()
+    if region not in VALID_REGIONS:
+        raise HTTPException(status_code=400, detail=f"region deve ser um de: {sorted(VALID_REGIONS)}")
+    
+    data = await cached_trending_stocks(limit, region)
+    return success_envelope(data)
 
 # ============== API ROUTES - CRYPTO ==============
 
-@app.get("/api/v3/crypto/{symbol}", response_model=APIResponse)
+@app.get("/api/v3/crypto/{symbol}", responses=API_DOCS)
+@safe_endpoint("busca de crypto")
 async def get_crypto(
-    symbol: str = Path(..., description="Símbolo da criptomoeda"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    symbol: str = Path(..., description="Símbolo da criptomoeda")
 ):
     """Busca dados de uma criptomoeda específica"""
-    try:
-        data = await orchestrator.get_crypto_data(symbol.upper())
-        
-        if not data:
-            raise HTTPException(status_code=404, detail=f"Criptomoeda {symbol} não encontrada")
-        
-        return APIResponse(success=True, data=data)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao buscar crypto {symbol}: {e}")
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    symbol = normalize_symbol(symbol)
+    key = "crypto:" + symbol
+    data = None if is_recent_not_found(key) else await orchestrator.get_crypto_data(symbol)
+    
+    if not data:
+        remember_not_found(key)
+        raise HTTPException(status_code=404, detail=f"Criptomoeda {symbol} não encontrada")
+    
+    return success_envelope(data)
 
-@app.get("/api/v3/crypto/trending", response_model=APIResponse)
+@app.get("/api/v3/crypto/trending", responses=API_DOCS)
+@safe_endpoint("trending cryptos")
 async def get_trending_cryptos(
     limit: int = Query(10, ge=1, le=50, description="Número de criptomoedas"),
-    order_by: str = Query("percent_change_24h", description="Ordenação"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    order_by: str = Query("percent_change_24h", description="Ordenação")
 ):
     """Busca criptomoedas em alta"""
-    try:
-        valid_orders = ["percent_change_24h", "market_cap", "volume", "price"]
-        if order_by not in valid_orders:
-            raise HTTPException(status_code=400, detail=f"order_by deve ser um de: {valid_orders}")
-        
-        data = await orchestrator.get_trending_cryptos(limit=limit, order_by=order_by)
-        return APIResponse(success=True, data=data)
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Erro ao buscar trending cryptos: {e}")
-        raise HTTPException(status_code=500, detail="Erro interno do servidor")
+    if order_by not in VALID_CRYPTO_ORDERS:
+        raise HTTPException(status_code=400, detail=f"order_by deve ser um de: {sorted(VALID_CRYPTO_ORDERS)}")
+    
+    data = await cached_trending_cryptos(limit, order_by)
+    return success_envelope(data)
 
 # ============== HTMX ROUTES FOR FRONTEND ==============
 
+HTMX_ERROR_TEMPLATE = "<div class='error'>Erro ao carregar {kind}: {message}</div>"
+
+def htmx_error(kind: str, error: Exception) -> HTMLResponse:
+    """Fragmento de erro para o swap do HTMX, com a mensagem escapada"""
+    return HTMLResponse(
+        HTMX_ERROR_TEMPLATE.format(kind=kind, message=html.escape(str(error)))
+    )
+
 @app.get("/htmx/stocks/trending")
 async def htmx_trending_stocks(
     request: Request,
     limit: int = Query(10, ge=1, le=20),
-    region: str = Query("US"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    region: str = Query("US")
 ):
     """Endpoint HTMX para ações em alta"""
     try:
-        stocks = await orchestrator.get_trending_stocks(limit=limit, region=region.upper())
+        stocks = await cached_trending_stocks(limit, region.upper())
         
-        return templates.TemplateResponse(
-            "partials/new_stocks_table.html",
-            {"request": request, "stocks": stocks, "region": region.upper()}
-        )
+        return HTMLResponse(STOCKS_TABLE_TEMPLATE.render(
+            request=request, stocks=stocks, region=region.upper()
+        ))
         
     except Exception as e:
-        logger.error(f"Erro HTMX stocks: {e}")
-        return f"<div class='error'>Erro ao carregar ações: {str(e)}</div>"
+        logger.exception("Erro HTMX stocks: %s", e)
+        return htmx_error("ações", e)
 
 @app.get("/htmx/crypto/trending")
 async def htmx_trending_cryptos(
     request: Request,
     limit: int = Query(10, ge=1, le=20),
-    order_by: str = Query("percent_change_24h"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
+    order_by: str = Query("percent_change_24h")
 ):
     """Endpoint HTMX para criptomoedas em alta"""
     try:
-        cryptos = await orchestrator.get_trending_cryptos(limit=limit, order_by=order_by)
+        cryptos = await cached_trending_cryptos(limit, order_by)
         
-        return templates.TemplateResponse(
-            "partials/crypto_table.html",
-            {"request": request, "cryptos": cryptos, "order_by": order_by}
-        )
+        return HTMLResponse(CRYPTO_TABLE_TEMPLATE.render(
+            request=request, cryptos=cryptos, order_by=order_by
+        ))
         
     except Exception as e:
-        logger.error(f"Erro HTMX crypto: {e}")
-        return f"<div class='error'>Erro ao carregar criptomoedas: {str(e)}</div>"
+        logger.exception("Erro HTMX crypto: %s", e)
+        return htmx_error("criptomoedas", e)
 
 # ============== ADMIN ROUTES ==============
 
-@app.post("/api/v3/admin/cache/clear", response_model=APIResponse)
-async def clear_cache(
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
-):
+@app.post("/api/v3/admin/cache/clear", responses=API_DOCS)
+@safe_endpoint("limpeza de cache", "Erro ao limpar cache")
+async def clear_cache():
     """Limpa o cache dos serviços"""
-    try:
-        result = await orchestrator.clear_all_caches()
-        return APIResponse(success=result['success'], data=result)
-        
-    except Exception as e:
-        logger.error(f"Erro ao limpar cache: {e}")
-        raise HTTPException(status_code=500, detail="Erro ao limpar cache")
-
-@app.get("/api/v3/admin/metrics", response_model=APIResponse)
-async def get_metrics(
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
-):
+    result = await orchestrator.clear_all_caches()
+    trending_cache.clear()
+    recent_not_found.clear()
+    metrics_body_cache.clear()
+    return success_envelope(result, success=result['success'])
+
+@app.get("/api/v3/admin/metrics", responses=API_DOCS)
+@safe_endpoint("métricas", "Erro ao obter métricas")
+async def get_metrics():
     """Retorna métricas do sistema"""
-    try:
-        metrics = await orchestrator.get_system_metrics()
-        return APIResponse(success=True, data=metrics)
-        
-    except Exception as e:
-        logger.error(f"Erro ao obter métricas: {e}")
-        raise HTTPException(status_code=500, detail="Erro ao obter métricas")
+    payload = await metrics_body_cache.get_or_load(
+        "metrics", lambda: serialized_envelope(orchestrator.get_system_metrics)
+    )
+    return cached_json_response(payload)
 
 # ============== HEALTH & MONITORING ==============
 
-@app.get("/api/v3/health", response_model=APIResponse)
-async def health_check(
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
-):
+@app.get("/api/v3/health", responses=API_DOCS)
+@safe_endpoint("health check", "Erro no health check")
+async def health_check():
     """Health check da API"""
-    try:
-        health_data = await orchestrator.health_check()
-        return APIResponse(success=True, data=health_data)
-        
-    except Exception as e:
-        logger.error(f"Erro no health check: {e}")
-        raise HTTPException(status_code=500, detail="Erro no health check")
+    payload = await health_body_cache.get_or_load(
+        "health", lambda: serialized_envelope(orchestrator.health_check)
+    )
+    return cached_json_response(payload)
 
 # ============== LEGACY COMPATIBILITY ROUTES ==============
 
-# V2 Compatibility
-@app.post("/api/v2/admin/cache/clear", response_model=APIResponse)
-async def clear_cache_v2(orchestrator: ServiceOrchestrator = Depends(get_orchestrator)):
-    """Compatibilidade com v2"""
-    return await clear_cache(orchestrator)
-
-@app.get("/api/v2/stocks/trending", response_model=APIResponse)
-async def get_trending_stocks_v2(
-    limit: int = Query(10, ge=1, le=50),
-    region: str = Query("US"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
-):
-    """Compatibilidade com v2"""
-    return await get_trending_stocks(limit, region, orchestrator)
-
-@app.get("/api/v2/crypto/trending", response_model=APIResponse)
-async def get_trending_cryptos_v2(
-    limit: int = Query(10, ge=1, le=50),
-    order_by: str = Query("percent_change_24h"),
-    orchestrator: ServiceOrchestrator = Depends(get_orchestrator)
-):
-    """Compatibilidade com v2"""
-    return await get_trending_cryptos(limit, order_by, orchestrator)
+# V2 Compatibility: os mesmos handlers v3 registrados nos caminhos antigos
+app.add_api_route("/api/v2/admin/cache/clear", clear_cache, methods=["POST"], responses=API_DOCS)
+app.add_api_route("/api/v2/stocks/trending", get_trending_stocks, methods=["GET"], responses=API_DOCS)
+app.add_api_route("/api/v2/crypto/trending", get_trending_cryptos, methods=["GET"], responses=API_DOCS)
 
 # ============== EXCEPTION HANDLERS ==============
 
+@app.exception_handler(400)
+async def bad_request_handler(request: Request, exc: HTTPException):
+    """Handler para 400 (símbolo e filtros inválidos) no envelope v3"""
+    return error_response(exc.detail, 400)
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
-    """Handler para 404"""
-    return APIResponse(success=False, error="Endpoint não encontrado")
+    """Handler para 404; mantém o detalhe levantado pelas rotas"""
+    # Rota inexistente chega com o detalhe padrão do Starlette
+    if exc.detail == "Not Found":
+        return error_response("Endpoint não encontrado", 404)
+    return error_response(exc.detail, 404)
 
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc: HTTPException):
     """Handler para 500"""
-    return APIResponse(success=False, error="Erro interno do servidor")
+    return error_response("Erro interno do servidor", 500)
 
 # ============== APPLICATION RUNNER ==============
 
 if __name__ == "__main__":
+    # uvloop + httptools (uvicorn[standard]); com reload (apenas em
+    # desenvolvimento) o uvicorn roda um único processo. Em produção, sem
+    # access log por request e sem os cabeçalhos Server/Date
     uvicorn.run(
         "modern_fastapi_app:app",
         host=Config.FASTAPI_HOST,
         port=Config.FASTAPI_PORT,
+        loop="uvloop",
+        http="httptools",
         reload=Config.FASTAPI_RELOAD,
-        log_level="info"
+        workers=1 if Config.FASTAPI_RELOAD else Config.FASTAPI_WORKERS,
+        access_log=not Config.IS_PRODUCTION,
+        server_header=not Config.IS_PRODUCTION,
+        date_header=not Config.IS_PRODUCTION,
+        log_level="warning" if Config.IS_PRODUCTION else "info"
     )
@@ -2,27 +2,35 @@
 VmPro Mini Tracker - Arquitetura Moderna v3.0.0
 FastAPI Application seguindo princípios SOLID e Clean Architecture
 """
-from fastapi import FastAPI, HTTPException, Query, Path, Request, Depends
+from fastapi import FastAPI, HTTPException, Query, Path, Request, Depends, Header
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Union
+from typing import Annotated, List, Dict, Optional, Union
 import asyncio
 from datetime import datetime
 import uvicorn
 import logging
 
-# Importar Service Orchestrator (Facade Pattern)
-from services.service_orchestrator import ServiceOrchestrator
-
 # Modelos de API
 from models.api_models import *
 
+# Controllers e Service Manager
+from controllers.modern_controllers import (
+    StockController, CryptoController, AdminController, HTMXController,
+    MultipleStocksRequest, TrendingStocksRequest, TrendingCryptosRequest,
+    Region, CryptoOrderBy, HTMXRegion
+)
+from services.service_manager import ServiceManager
+from services.optimized_stock_service import OptimizedStockService
+from services.optimized_crypto_service import OptimizedCryptoService
+
 # Configuração
 from utils.config import Config
+from utils.serialization import FastJSONResponse
 
 # ============== LOGGING CONFIGURATION ==============
 
@@ -40,15 +48,6 @@ class APIResponse(BaseModel):
     error: Optional[str] = None
     timestamp: str = datetime.now().isoformat()
 
-# ============== DEPENDENCY INJECTION ==============
-
-# Service Orchestrator Singleton
-orchestrator = ServiceOrchestrator()
-
-def get_orchestrator() -> ServiceOrchestrator:
-    """Dependency provider para Service Orchestrator"""
-    return orchestrator
-
 # ============== FASTAPI APPLICATION ==============
 
 app = FastAPI(
@@ -57,7 +56,8 @@ app = FastAPI(
     version="3.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
-    openapi_url="/api/openapi.json"
+    openapi_url="/api/openapi.json",
+    default_response_class=FastJSONResponse
 )
 
 # ============== MIDDLEWARES ==============
@@ -76,8 +76,6 @@ app.add_middleware(
 
 # ============== STATIC FILES & TEMPLATES ==============
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
@@ -98,12 +96,16 @@ admin_controller = AdminController(service_manager)
 htmx_controller = HTMXController(service_manager, templates)
 
 # Dependency para obter IP do cliente
-def get_client_ip(request: Request) -> str:
-    """Extrai IP do cliente da requisição"""
+def get_client_ip(request: Request) -> bytes:
+    """Extrai IP do cliente da requisição, já codificado para as chaves de rate limit"""
     forwarded = request.headers.get("X-Forwarded-For")
     if forwarded:
-        return forwarded.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
+        return forwarded.split(",")[0].strip().encode()
+    return request.client.host.encode() if request.client else b"unknown"
+
+async def rate_limit_admin(client_ip: bytes = Depends(get_client_ip)) -> None:
+    """Dependency de rate limiting para rotas administrativas"""
+    await admin_controller.check_rate_limit(client_ip)
 
 # ============== ROTAS DO FRONTEND ==============
 
@@ -116,52 +118,52 @@ async def dashboard(request: Request):
 
 @app.get("/api/v3/stocks/{symbol}")
 async def get_stock(
-    symbol: str = Path(..., description="Símbolo da ação (ex: AAPL, VALE3.SA)"),
-    client_ip: str = Depends(get_client_ip)
+    symbol: str = Path(..., min_length=1, max_length=20, description="Símbolo da ação (ex: AAPL, VALE3.SA)"),
+    client_ip: bytes = Depends(get_client_ip)
 ):
     """Busca dados de uma ação específica"""
-    request = StockRequest(symbol=symbol)
-    return await stock_controller.get_stock(request, client_ip)
+    return await stock_controller.get_stock(symbol, client_ip)
 
 @app.get("/api/v3/stocks")
 async def get_multiple_stocks(
-    symbols: str = Query(..., description="Símbolos separados por vírgula"),
-    client_ip: str = Depends(get_client_ip)
+    symbols: str = Query(..., min_length=1, description="Símbolos separados por vírgula"),
+    client_ip: bytes = Depends(get_client_ip)
 ):
     """Busca dados de múltiplas ações"""
-    request = MultipleStocksRequest(symbols=symbols)
+    request = MultipleStocksRequest(raw_symbols=symbols)
     return await stock_controller.get_multiple_stocks(request, client_ip)
 
 @app.get("/api/v3/stocks/trending")
 async def get_trending_stocks(
     limit: int = Query(10, ge=1, le=50, description="Número de ações a retornar"),
-    region: Region = Query(Region.US, description="Região do mercado (US ou BR)"),
-    client_ip: str = Depends(get_client_ip)
+    region: Region = Query("US", description="Região do mercado (US ou BR)"),
+    client_ip: bytes = Depends(get_client_ip),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Busca ações em alta por região"""
     request = TrendingStocksRequest(limit=limit, region=region)
-    return await stock_controller.get_trending_stocks(request, client_ip)
+    return await stock_controller.get_trending_stocks(request, client_ip, if_none_match)
 
 # ============== ROTAS DE CRIPTOMOEDAS ==============
 
 @app.get("/api/v3/crypto/{symbol}")
 async def get_crypto(
-    symbol: str = Path(..., description="Símbolo da criptomoeda (ex: BTC, ETH)"),
-    client_ip: str = Depends(get_client_ip)
+    symbol: str = Path(..., min_length=1, max_length=20, description="Símbolo da criptomoeda (ex: BTC, ETH)"),
+    client_ip: bytes = Depends(get_client_ip)
 ):
     """Busca dados de uma criptomoeda específica"""
-    request = CryptoRequest(symbol=symbol)
-    return await crypto_controller.get_crypto(request, client_ip)
+    return await crypto_controller.get_crypto(symbol, client_ip)
 
 @app.get("/api/v3/crypto/trending")
 async def get_trending_cryptos(
     limit: int = Query(10, ge=1, le=50, description="Número de criptomoedas a retornar"),
-    order_by: CryptoOrderBy = Query(CryptoOrderBy.PERCENT_CHANGE_24H, description="Ordenação"),
-    client_ip: str = Depends(get_client_ip)
+    order_by: CryptoOrderBy = Query("percent_change_24h", description="Ordenação"),
+    client_ip: bytes = Depends(get_client_ip),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Busca criptomoedas em alta"""
     request = TrendingCryptosRequest(limit=limit, order_by=order_by)
-    return await crypto_controller.get_trending_cryptos(request, client_ip)
+    return await crypto_controller.get_trending_cryptos(request, client_ip, if_none_match)
 
 # ============== ROTAS HTMX PARA FRONTEND ==============
 
@@ -169,7 +171,7 @@ async def get_trending_cryptos(
 async def htmx_trending_stocks(
     request: Request,
     limit: int = Query(10, ge=1, le=20),
-    region: str = Query("US")
+    region: Annotated[HTMXRegion, Query()] = "US"
 ):
     """Endpoint HTMX para ações em alta"""
     return await htmx_controller.htmx_trending_stocks(request, limit, region)
@@ -178,7 +180,7 @@ async def htmx_trending_stocks(
 async def htmx_trending_cryptos(
     request: Request,
     limit: int = Query(10, ge=1, le=20),
-    order_by: str = Query("percent_change_24h")
+    order_by: CryptoOrderBy = Query("percent_change_24h")
 ):
     """Endpoint HTMX para criptomoedas em alta"""
     return await htmx_controller.htmx_trending_cryptos(request, limit, order_by)
@@ -190,15 +192,15 @@ async def health_check():
     """Health check completo da API"""
     return await admin_controller.health_check()
 
-@app.post("/api/v3/admin/cache/clear")
-async def clear_cache(client_ip: str = Depends(get_client_ip)):
+@app.post("/api/v3/admin/cache/clear", dependencies=[Depends(rate_limit_admin)])
+async def clear_cache():
     """Limpa todos os caches"""
-    return await admin_controller.clear_cache(client_ip)
+    return await admin_controller.clear_cache()
 
-@app.get("/api/v3/admin/cache/stats")
-async def get_cache_stats(client_ip: str = Depends(get_client_ip)):
+@app.get("/api/v3/admin/cache/stats", dependencies=[Depends(rate_limit_admin)])
+async def get_cache_stats():
     """Retorna estatísticas dos caches e serviços"""
-    return await admin_controller.get_cache_stats(client_ip)
+    return await admin_controller.get_cache_stats()
 
 @app.get("/api/v3/admin/metrics")
 async def get_service_metrics():
@@ -221,12 +223,12 @@ async def get_service_metrics():
 # ============== ROTAS LEGADAS PARA COMPATIBILIDADE ==============
 
 @app.get("/api/v2/stocks/{symbol}")
-async def get_stock_v2(symbol: str, client_ip: str = Depends(get_client_ip)):
+async def get_stock_v2(symbol: str, client_ip: bytes = Depends(get_client_ip)):
     """Compatibilidade com versão anterior"""
     return await get_stock(symbol, client_ip)
 
 @app.get("/api/v2/stocks")
-async def get_multiple_stocks_v2(symbols: str, client_ip: str = Depends(get_client_ip)):
+async def get_multiple_stocks_v2(symbols: str, client_ip: bytes = Depends(get_client_ip)):
     """Compatibilidade com versão anterior"""
     return await get_multiple_stocks(symbols, client_ip)
 
@@ -234,14 +236,16 @@ async def get_multiple_stocks_v2(symbols: str, client_ip: str = Depends(get_clie
 async def get_trending_stocks_v2(
     limit: int = 10,
     region: str = "US",
-    client_ip: str = Depends(get_client_ip)
+    client_ip: bytes = Depends(get_client_ip),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Compatibilidade com versão anterior"""
-    region_enum = Region.US if region.upper() == "US" else Region.BR
-    return await get_trending_stocks(limit, region_enum, client_ip)
+    return await get_trending_stocks(
+        limit, "US" if region.upper() == "US" else "BR", client_ip, if_none_match
+    )
 
 @app.get("/api/v2/crypto/{symbol}")
-async def get_crypto_v2(symbol: str, client_ip: str = Depends(get_client_ip)):
+async def get_crypto_v2(symbol: str, client_ip: bytes = Depends(get_client_ip)):
     """Compatibilidade com versão anterior"""
     return await get_crypto(symbol, client_ip)
 
@@ -249,24 +253,20 @@ async def get_crypto_v2(symbol: str, client_ip: str = Depends(get_client_ip)):
 async def get_trending_cryptos_v2(
     limit: int = 10,
     order_by: str = "percent_change_24h",
-    client_ip: str = Depends(get_client_ip)
+    client_ip: bytes = Depends(get_client_ip),
+    if_none_match: Optional[str] = Header(None)
 ):
     """Compatibilidade com versão anterior"""
-    order_by_enum = CryptoOrderBy.PERCENT_CHANGE_24H
-    if order_by == "market_cap":
-        order_by_enum = CryptoOrderBy.MARKET_CAP
-    elif order_by == "volume":
-        order_by_enum = CryptoOrderBy.VOLUME
-    elif order_by == "price":
-        order_by_enum = CryptoOrderBy.PRICE
+    if order_by not in ("market_cap", "volume", "price"):
+        order_by = "percent_change_24h"
     
-    return await get_trending_cryptos(limit, order_by_enum, client_ip)
+    return await get_trending_cryptos(limit, order_by, client_ip, if_none_match)
 
 # Rota v2 para cache
-@app.post("/api/v2/admin/cache/clear")
-async def clear_cache_v2(client_ip: str = Depends(get_client_ip)):
+@app.post("/api/v2/admin/cache/clear", dependencies=[Depends(rate_limit_admin)])
+async def clear_cache_v2():
     """Compatibilidade com versão anterior"""
-    return await clear_cache(client_ip)
+    return await clear_cache()
 
 # ============== EVENTOS DO CICLO DE VIDA ==============
 
@@ -279,12 +279,21 @@ async def startup_event():
     # Verificar saúde inicial dos serviços
     health = await service_manager.health_check()
     print(f"📈 Serviços iniciados: {health['summary']['healthy_services']}/{health['summary']['total_services']}")
+    
+    # Manter o cache de trending aquecido fora do caminho das requisições
+    app.state.trending_refresher = asyncio.create_task(
+        htmx_controller.run_trending_refresher()
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Evento executado no encerramento da aplicação"""
     print("🔄 Encerrando aplicação...")
     
+    refresher = getattr(app.state, "trending_refresher", None)
+    if refresher:
+        refresher.cancel()
+    
     # Limpar recursos se necessário
     try:
         await service_manager.clear_all_caches()
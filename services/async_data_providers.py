@@ -6,11 +6,12 @@ Implementações otimizadas para APIs Yahoo Finance e CoinGecko
 import asyncio
 import time
 from datetime import datetime
+from operator import itemgetter
 from typing import Any, Dict, List, Optional
 
 import aiohttp
+import ujson
 import yfinance as yf
-from pycoingecko import CoinGeckoAPI
 
 from utils.config import Config
 
@@ -33,8 +34,21 @@ class AsyncDataProvider:
         """Inicializa a sessão HTTP"""
         if not self.session:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
+            # Pool keep-alive por host: requests seguintes reaproveitam a
+            # conexão TLS já aberta, com DNS em cache por 5 minutos
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrent * 2,
+                limit_per_host=self.max_concurrent,
+                use_dns_cache=True,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                # Fecha transportes SSL abortados (ClientOSError em processos longos)
+                enable_cleanup_closed=True,
+            )
             self.session = aiohttp.ClientSession(
                 timeout=timeout,
+                connector=connector,
+                json_serialize=ujson.dumps,
                 headers={
                     'User-Agent': 'Mini-Tracker/2.0 (Financial Data Aggregator)',
                     'Accept': 'application/json',
@@ -78,11 +92,15 @@ class AsyncYahooProvider(AsyncDataProvider):
             try:
                 await self.initialize()
 
-                # Usar yfinance de forma síncrona em thread separada
-                loop = asyncio.get_event_loop()
-                data = await loop.run_in_executor(
-                    None, self._fetch_stock_sync, symbol
-                )
+                try:
+                    data = await self._fetch_stock_async(symbol)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    # Fallback: yfinance síncrono em thread separada
+                    print(f'⚠️ Chart API falhou para {symbol}, usando yfinance: {e}')
+                    loop = asyncio.get_event_loop()
+                    data = await loop.run_in_executor(
+                        None, self._fetch_stock_sync, symbol
+                    )
 
                 self.request_count += 1
                 self.total_time += time.time() - start_time
@@ -94,6 +112,54 @@ class AsyncYahooProvider(AsyncDataProvider):
                 print(f'⚠️ Erro ao buscar {symbol}: {e}')
                 return None
 
+    async def _fetch_stock_async(self, symbol: str) -> Optional[Dict]:
+        """Busca dados de ação direto na chart API pela sessão aiohttp"""
+        # Com range=1d, chartPreviousClose é o fechamento do pregão anterior
+        async with self.session.get(
+            f'{self.base_url}/{symbol}', params={'range': '1d', 'interval': '1d'}
+        ) as response:
+            if response.status == 404:
+                return None
+            response.raise_for_status()
+            payload = await response.json(loads=ujson.loads)
+
+        result = (payload.get('chart') or {}).get('result') or []
+        if not result:
+            return None
+
+        chart = result[0]
+        meta = chart.get('meta') or {}
+
+        current_price = meta.get('regularMarketPrice')
+        if current_price is None:
+            return None
+        previous_close = (
+            meta.get('previousClose')
+            or meta.get('chartPreviousClose')
+            or current_price
+        )
+
+        volume = meta.get('regularMarketVolume')
+        if volume is None:
+            # Volume do último candle; nulos não são filtrados para manter
+            # o índice alinhado ao candle
+            quote = (chart.get('indicators', {}).get('quote') or [{}])[0]
+            volumes = quote.get('volume') or []
+            volume = volumes[-1] if volumes else None
+
+        return {
+            'symbol': symbol.upper(),
+            'name': meta.get('longName')
+            or meta.get('shortName')
+            or symbol.upper(),
+            'price': float(current_price),
+            'previous_close': float(previous_close),
+            # A chart API não traz market cap: sempre None neste caminho
+            'market_cap': None,
+            'volume': int(volume) if volume is not None else None,
+            'last_updated': datetime.now(),
+        }
+
     def _fetch_stock_sync(self, symbol: str) -> Optional[Dict]:
         """Busca dados de ação de forma síncrona (para executar em thread)"""
         try:
@@ -158,21 +224,19 @@ class AsyncYahooProvider(AsyncDataProvider):
         stocks_data = await self.get_multiple_stocks(symbols)
 
         # Converter para lista e calcular mudanças percentuais
-        trending_list = []
-
-        for symbol, data in stocks_data.items():
-            if data and data.get('previous_close', 0) > 0:
-                change_percent = (
-                    (data['price'] - data['previous_close'])
-                    / data['previous_close']
-                ) * 100
-                data['change_percent'] = change_percent
-                trending_list.append(data)
-
-        # Ordenar por performance
-        trending_list.sort(
-            key=lambda x: x.get('change_percent', 0), reverse=True
-        )
+        trending_list = [
+            data
+            for data in stocks_data.values()
+            if data and data.get('previous_close', 0) > 0
+        ]
+        for data in trending_list:
+            data['change_percent'] = (
+                data['price'] / data['previous_close'] - 1
+            ) * 100
+
+        # Ordenar por performance (itemgetter: chave em C, sem lambda)
+        if len(trending_list) > 1:
+            trending_list.sort(key=itemgetter('change_percent'), reverse=True)
 
         return trending_list
 
@@ -184,8 +248,9 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
         super().__init__(
             max_concurrent=5, timeout=30
         )  # CoinGecko tem rate limits mais restritivos
+        # Requests pela sessão aiohttp: o connector limita a max_concurrent (5)
+        # conexões keep-alive com a API
         self.base_url = 'https://api.coingecko.com/api/v3'
-        self.cg = CoinGeckoAPI()
 
         # Mapping de símbolos para IDs do CoinGecko
         self.symbol_to_id = {
@@ -208,11 +273,7 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
             start_time = time.time()
 
             try:
-                # Executar operação síncrona em thread separada
-                loop = asyncio.get_event_loop()
-                data = await loop.run_in_executor(
-                    None, self._fetch_crypto_sync, symbol
-                )
+                data = await self._fetch_crypto(symbol)
 
                 self.request_count += 1
                 self.total_time += time.time() - start_time
@@ -224,34 +285,48 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
                 print(f'⚠️ Erro ao buscar crypto {symbol}: {e}')
                 return None
 
-    def _fetch_crypto_sync(self, symbol: str) -> Optional[Dict]:
-        """Busca dados de criptomoeda de forma síncrona"""
+    async def _get_json(self, path: str, params: Dict[str, str]) -> Any:
+        """GET na API do CoinGecko pela sessão compartilhada"""
+        await self.initialize()
+        async with self.session.get(
+            f'{self.base_url}{path}', params=params
+        ) as response:
+            response.raise_for_status()
+            return await response.json(loads=ujson.loads)
+
+    async def _fetch_crypto(self, symbol: str) -> Optional[Dict]:
+        """Busca dados de criptomoeda pelo endpoint /coins/{id}"""
         try:
             crypto_id = self.symbol_to_id.get(symbol.upper())
 
             if not crypto_id:
                 # Tentar buscar pelo símbolo
-                search_results = self.cg.search(query=symbol)
-                if search_results['coins']:
+                search_results = await self._get_json(
+                    '/search', {'query': symbol}
+                )
+                if search_results.get('coins'):
                     crypto_id = search_results['coins'][0]['id']
                 else:
                     return None
 
             # Buscar dados atuais
-            data = self.cg.get_coin_by_id(
-                id=crypto_id,
-                localization=False,
-                tickers=False,
-                market_data=True,
-                community_data=False,
-                developer_data=False,
-                sparkline=False,
+            data = await self._get_json(
+                f'/coins/{crypto_id}',
+                {
+                    'localization': 'false',
+                    'tickers': 'false',
+                    'market_data': 'true',
+                    'community_data': 'false',
+                    'developer_data': 'false',
+                    'sparkline': 'false',
+                },
             )
 
             market_data = data.get('market_data', {})
             current_price = market_data.get('current_price', {}).get('usd', 0)
-            price_change_24h = market_data.get(
-                'price_change_percentage_24h', 0
+            # Sempre numérico: é a chave de ordenação do trending
+            price_change_24h = (
+                market_data.get('price_change_percentage_24h') or 0
             )
 
             # Calcular preço anterior baseado na mudança de 24h
@@ -272,43 +347,93 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
             }
 
         except Exception as e:
-            print(f'Erro no _fetch_crypto_sync para {symbol}: {e}')
+            print(f'Erro no _fetch_crypto para {symbol}: {e}')
             return None
 
     async def get_multiple_cryptos(
         self, symbols: List[str]
     ) -> Dict[str, Dict]:
-        """Busca múltiplas criptomoedas com controle de rate limit"""
+        """Busca múltiplas criptomoedas com uma única chamada /coins/markets"""
         results = {}
 
-        # Processar em batches menores para respeitar rate limits
-        batch_size = 3
+        # id do CoinGecko -> símbolo pedido; sem mapping cai na busca individual
+        ids = {}
+        unmapped = []
+        for symbol in symbols:
+            crypto_id = self.symbol_to_id.get(symbol.upper())
+            if crypto_id:
+                ids[crypto_id] = symbol.upper()
+            else:
+                unmapped.append(symbol)
+
+        if ids:
+            async with self.semaphore:
+                start_time = time.time()
+
+                try:
+                    coins = await self._get_json(
+                        '/coins/markets',
+                        {
+                            'vs_currency': 'usd',
+                            'ids': ','.join(ids),
+                            'per_page': '250',
+                            'sparkline': 'false',
+                            'price_change_percentage': '24h',
+                        },
+                    )
 
-        for i in range(0, len(symbols), batch_size):
-            batch = symbols[i : i + batch_size]
+                    self.request_count += 1
+                    self.total_time += time.time() - start_time
 
-            tasks = []
-            for symbol in batch:
-                task = asyncio.create_task(self.get_crypto_data(symbol))
-                tasks.append((symbol, task))
+                    for coin in coins:
+                        symbol = ids.get(coin.get('id'))
+                        if symbol:
+                            results[symbol] = self._market_coin_to_dict(
+                                coin, symbol
+                            )
 
-            # Aguardar batch atual
+                except Exception as e:
+                    self.error_count += 1
+                    print(f'⚠️ Erro ao buscar cryptos em lote: {e}')
+
+        if unmapped:
             completed_tasks = await asyncio.gather(
-                *[task for _, task in tasks], return_exceptions=True
+                *[self.get_crypto_data(symbol) for symbol in unmapped],
+                return_exceptions=True,
             )
 
-            for (symbol, _), result in zip(tasks, completed_tasks):
+            for symbol, result in zip(unmapped, completed_tasks):
                 if isinstance(result, Exception):
                     print(f'⚠️ Erro ao buscar crypto {symbol}: {result}')
                 elif result:
                     results[symbol.upper()] = result
 
-            # Aguardar entre batches para respeitar rate limits
-            if i + batch_size < len(symbols):
-                await asyncio.sleep(0.5)
-
         return results
 
+    def _market_coin_to_dict(
+        self, coin: Dict, symbol: Optional[str] = None
+    ) -> Dict:
+        """Converte uma linha de /coins/markets no formato do provedor"""
+        current_price = coin.get('current_price') or 0
+        price_change_24h = coin.get('price_change_percentage_24h') or 0
+
+        # Calcular preço anterior baseado na mudança de 24h
+        if price_change_24h != 0:
+            previous_price = current_price / (1 + (price_change_24h / 100))
+        else:
+            previous_price = current_price
+
+        return {
+            'symbol': symbol or coin.get('symbol', '').upper(),
+            'name': coin.get('name', ''),
+            'price': current_price,
+            'previous_close': previous_price,
+            'market_cap': coin.get('market_cap'),
+            'volume_24h': coin.get('total_volume'),
+            'change_percent_24h': price_change_24h,
+            'last_updated': datetime.now(),
+        }
+
     async def get_trending_cryptos(self, limit: int = 10) -> List[Dict]:
         """Busca criptomoedas em alta usando batch otimizado"""
         symbols = Config.DEFAULT_CRYPTOS[:limit]
@@ -316,9 +441,10 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
 
         # Converter para lista e ordenar
         trending_list = list(cryptos_data.values())
-        trending_list.sort(
-            key=lambda x: x.get('change_percent_24h', 0), reverse=True
-        )
+        if len(trending_list) > 1:
+            trending_list.sort(
+                key=itemgetter('change_percent_24h'), reverse=True
+            )
 
         return trending_list[:limit]
 
@@ -326,47 +452,19 @@ class AsyncCoinGeckoProvider(AsyncDataProvider):
         """Busca trending diretamente da API do CoinGecko (método alternativo)"""
         async with self.semaphore:
             try:
-                loop = asyncio.get_event_loop()
-                coins = await loop.run_in_executor(
-                    None,
-                    lambda: self.cg.get_coins_markets(
-                        vs_currency='usd',
-                        order='percent_change_24h_desc',
-                        per_page=limit,
-                        page=1,
-                        sparkline=False,
-                        price_change_percentage='24h',
-                    ),
+                coins = await self._get_json(
+                    '/coins/markets',
+                    {
+                        'vs_currency': 'usd',
+                        'order': 'percent_change_24h_desc',
+                        'per_page': str(limit),
+                        'page': '1',
+                        'sparkline': 'false',
+                        'price_change_percentage': '24h',
+                    },
                 )
 
-                result = []
-                for coin in coins:
-                    current_price = coin.get('current_price', 0)
-                    price_change_24h = coin.get(
-                        'price_change_percentage_24h', 0
-                    )
-
-                    if price_change_24h != 0:
-                        previous_price = current_price / (
-                            1 + (price_change_24h / 100)
-                        )
-                    else:
-                        previous_price = current_price
-
-                    result.append(
-                        {
-                            'symbol': coin.get('symbol', '').upper(),
-                            'name': coin.get('name', ''),
-                            'price': current_price,
-                            'previous_close': previous_price,
-                            'market_cap': coin.get('market_cap'),
-                            'volume_24h': coin.get('total_volume'),
-                            'change_percent_24h': price_change_24h,
-                            'last_updated': datetime.now(),
-                        }
-                    )
-
-                return result
+                return [self._market_coin_to_dict(coin) for coin in coins]
 
             except Exception as e:
                 print(f'⚠️ Erro ao buscar trending do CoinGecko: {e}')
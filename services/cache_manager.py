@@ -6,56 +6,106 @@ Sistema de cache otimizado para alta performance
 import asyncio
 import time
 import weakref
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import ujson as json
 
 
 class CacheManager:
-    """Gerenciador de cache em memória com TTL e estratégias inteligentes"""
+    """Gerenciador de cache em memória com TTL e estratégias inteligentes
+
+    As chaves são distribuídas em SHARD_COUNT shards, cada um com seu lock:
+    operações em chaves de shards diferentes não disputam o mesmo lock. Dentro
+    do shard cada categoria tem seu próprio OrderedDict na ordem de uso (LRU
+    no início), e leituras não tomam lock.
+    """
+
+    SHARD_COUNT = 16  # potência de 2 (índice via máscara)
 
     def __init__(self, max_size: int = 1000, default_ttl: int = 300):
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: Dict[str, Dict] = {}
-        self.access_times: Dict[str, float] = {}
+        # LRU aproximado: cada shard despeja ao atingir sua fração do max_size
+        self.shard_max_size = max(1, max_size // self.SHARD_COUNT)
+        # shard -> categoria -> chave -> item
+        self.shards: List[Dict[str, "OrderedDict[str, Dict]"]] = [
+            defaultdict(OrderedDict) for _ in range(self.SHARD_COUNT)
+        ]
+        self.locks = [asyncio.Lock() for _ in range(self.SHARD_COUNT)]
         self.hit_count = 0
         self.miss_count = 0
-        self.lock = asyncio.Lock()
+        self._cleanup_task: Optional[asyncio.Task] = None
 
         # Estatísticas por tipo de dados
         self.stats = defaultdict(lambda: {'hits': 0, 'misses': 0, 'size': 0})
 
+    def _shard(self, category: str, key: str) -> int:
+        """Índice do shard de uma chave"""
+        return hash((category, key)) & (self.SHARD_COUNT - 1)
+
+    def _shard_size(self, index: int) -> int:
+        return sum(len(items) for items in self.shards[index].values())
+
+    def _size(self) -> int:
+        return sum(self._shard_size(index) for index in range(self.SHARD_COUNT))
+
     async def initialize(self):
         """Inicializa o cache manager"""
         print('🔧 Inicializando Cache Manager...')
 
-        # Iniciar limpeza periódica
-        asyncio.create_task(self._periodic_cleanup())
+        # Iniciar limpeza periódica (uma só, mesmo com initialize repetido);
+        # a referência evita que a task seja coletada pelo GC
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._periodic_cleanup())
 
     async def get(self, key: str, category: str = 'default') -> Optional[Any]:
         """Busca item no cache"""
-        async with self.lock:
-            full_key = f'{category}:{key}'
-
-            if full_key in self.cache:
-                cache_item = self.cache[full_key]
-
-                # Verificar TTL
-                if time.time() - cache_item['timestamp'] < cache_item['ttl']:
-                    self.access_times[full_key] = time.time()
-                    self.hit_count += 1
-                    self.stats[category]['hits'] += 1
-                    return cache_item['data']
-                else:
-                    # Item expirado
-                    await self._remove_item(full_key, category)
+        index = self._shard(category, key)
 
-            self.miss_count += 1
-            self.stats[category]['misses'] += 1
-            return None
+        cache_item, expired = self._lookup(
+            index, category, key, time.monotonic()
+        )
+        if cache_item is not None:
+            self.hit_count += 1
+            self.stats[category]['hits'] += 1
+            return cache_item['data']
+
+        if expired is not None:
+            async with self.locks[index]:
+                self._remove_expired_nolock(index, category, key, expired)
+
+        self.miss_count += 1
+        self.stats[category]['misses'] += 1
+        return None
+
+    def _lookup(
+        self, index: int, category: str, key: str, now: float
+    ) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Busca sem lock: (item válido, item expirado)
+
+        Lookup + move_to_end não cedem o event loop, então o hit dispensa o lock.
+        `now` vem do chamador para que lotes leiam o relógio uma vez só.
+        """
+        items = self.shards[index].get(category)
+        cache_item = items.get(key) if items is not None else None
+        if cache_item is None:
+            return None, None
+
+        # Verificar TTL
+        if now < cache_item['expires_at']:
+            items.move_to_end(key)
+            return cache_item, None
+        return None, cache_item
+
+    def _remove_expired_nolock(
+        self, index: int, category: str, key: str, cache_item: Dict
+    ) -> None:
+        """Remove o item expirado, se não foi substituído enquanto esperava o lock"""
+        items = self.shards[index].get(category)
+        if items is not None and items.get(key) is cache_item:
+            self._remove_item_nolock(index, category, key)
 
     async def set(
         self,
@@ -65,61 +115,108 @@ class CacheManager:
         ttl: Optional[int] = None,
     ) -> None:
         """Armazena item no cache"""
-        async with self.lock:
-            full_key = f'{category}:{key}'
-            ttl = ttl or self.default_ttl
-
-            # Remover item existente se houver
-            if full_key in self.cache:
-                await self._remove_item(full_key, category)
-
-            # Verificar se precisa fazer cleanup por tamanho
-            if len(self.cache) >= self.max_size:
-                await self._evict_least_recently_used()
-
-            # Adicionar novo item
-            self.cache[full_key] = {
-                'data': data,
-                'timestamp': time.time(),
-                'ttl': ttl,
-                'category': category,
-            }
-            self.access_times[full_key] = time.time()
-            self.stats[category]['size'] += 1
+        index = self._shard(category, key)
+
+        async with self.locks[index]:
+            self._set_nolock(
+                index,
+                category,
+                key,
+                data,
+                # Relógio monotônico: imune a ajustes do relógio do sistema
+                time.monotonic() + (ttl or self.default_ttl),
+            )
+
+    def _set_nolock(
+        self,
+        index: int,
+        category: str,
+        key: str,
+        data: Any,
+        expires_at: float,
+    ) -> None:
+        """Grava o item no shard (o chamador segura o lock do shard)"""
+        items = self.shards[index][category]
+
+        # Remover item existente se houver
+        if items.pop(key, None) is not None:
+            self.stats[category]['size'] -= 1
+        # Verificar se precisa fazer cleanup por tamanho
+        elif self._shard_size(index) >= self.shard_max_size:
+            self._evict_least_recently_used(index)
+
+        # Adicionar novo item
+        items[key] = {'data': data, 'expires_at': expires_at}
+        self.stats[category]['size'] += 1
 
     async def delete(self, key: str, category: str = 'default') -> bool:
         """Remove item do cache"""
-        async with self.lock:
-            full_key = f'{category}:{key}'
-            if full_key in self.cache:
-                await self._remove_item(full_key, category)
+        index = self._shard(category, key)
+
+        async with self.locks[index]:
+            items = self.shards[index].get(category)
+            if items is not None and key in items:
+                self._remove_item_nolock(index, category, key)
                 return True
             return False
 
     async def clear_category(self, category: str) -> int:
         """Limpa todos os itens de uma categoria"""
-        async with self.lock:
-            keys_to_remove = [
-                k for k in self.cache.keys() if k.startswith(f'{category}:')
-            ]
-            count = 0
+        count = 0
+
+        for index, shard in enumerate(self.shards):
+            async with self.locks[index]:
+                items = shard.pop(category, None)
+                if items:
+                    count += len(items)
+
+        if category in self.stats:
+            self.stats[category]['size'] -= count
 
-            for key in keys_to_remove:
-                await self._remove_item(key, category)
-                count += 1
+        return count
 
-            return count
+    async def clear_all(self) -> None:
+        """Limpa todos os dados do cache"""
+        for index in range(self.SHARD_COUNT):
+            async with self.locks[index]:
+                self.shards[index].clear()
+
+        # Reset das estatísticas
+        self.hit_count = 0
+        self.miss_count = 0
+
+        # Reset das estatísticas por categoria
+        for category in self.stats:
+            self.stats[category] = {'hits': 0, 'misses': 0, 'size': 0}
 
     async def get_batch(
         self, keys: List[str], category: str = 'default'
     ) -> Dict[str, Any]:
-        """Busca múltiplos itens do cache"""
+        """Busca múltiplos itens do cache (hits sem lock, um lock por shard
+        só para remover expirados)"""
         results = {}
+        expired_by_shard: Dict[int, List[Tuple[str, Dict]]] = defaultdict(list)
+        now = time.monotonic()
 
         for key in keys:
-            value = await self.get(key, category)
-            if value is not None:
-                results[key] = value
+            index = self._shard(category, key)
+
+            cache_item, expired = self._lookup(index, category, key, now)
+            if cache_item is not None:
+                results[key] = cache_item['data']
+            elif expired is not None:
+                expired_by_shard[index].append((key, expired))
+
+        for index, expired_items in expired_by_shard.items():
+            async with self.locks[index]:
+                for key, expired in expired_items:
+                    self._remove_expired_nolock(index, category, key, expired)
+
+        hits = len(results)
+        self.hit_count += hits
+        self.miss_count += len(keys) - hits
+        self.stats[category]['hits'] += hits
+        self.stats[category]['misses'] += len(keys) - hits
 
         return results
 
@@ -129,15 +226,23 @@ class CacheManager:
         category: str = 'default',
         ttl: Optional[int] = None,
     ) -> None:
-        """Armazena múltiplos itens no cache"""
+        """Armazena múltiplos itens no cache (um lock por shard)"""
+        expires_at = time.monotonic() + (ttl or self.default_ttl)
+        by_shard: Dict[int, List[Tuple[str, Any]]] = defaultdict(list)
+
         for key, data in items.items():
-            await self.set(key, data, category, ttl)
+            by_shard[self._shard(category, key)].append((key, data))
+
+        for index, entries in by_shard.items():
+            async with self.locks[index]:
+                for key, data in entries:
+                    self._set_nolock(index, category, key, data, expires_at)
 
     async def health_check(self) -> Dict[str, Any]:
         """Verifica saúde do cache"""
         return {
             'status': 'healthy',
-            'size': len(self.cache),
+            'size': self._size(),
             'max_size': self.max_size,
             'hit_rate': self._calculate_hit_rate(),
             'categories': dict(self.stats),
@@ -146,8 +251,9 @@ class CacheManager:
     async def get_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas detalhadas do cache"""
         return {
-            'total_size': len(self.cache),
+            'total_size': self._size(),
             'max_size': self.max_size,
+            'shards': self.SHARD_COUNT,
             'hit_count': self.hit_count,
             'miss_count': self.miss_count,
             'hit_rate': self._calculate_hit_rate(),
@@ -155,59 +261,47 @@ class CacheManager:
             'memory_usage': self._estimate_memory_usage(),
         }
 
-    async def _remove_item(self, full_key: str, category: str) -> None:
-        """Remove item do cache (método interno)"""
-        if full_key in self.cache:
-            del self.cache[full_key]
-        if full_key in self.access_times:
-            del self.access_times[full_key]
-        self.stats[category]['size'] -= 1
-
-    async def _evict_least_recently_used(self) -> None:
-        """Remove item menos recentemente usado"""
-        if not self.access_times:
-            return
-
-        # Encontrar item menos usado
-        oldest_key = min(self.access_times.items(), key=lambda x: x[1])[0]
+    def _remove_item_nolock(self, index: int, category: str, key: str) -> None:
+        """Remove item do shard (método interno, com o lock do shard)"""
+        items = self.shards[index].get(category)
+        if items is not None and items.pop(key, None) is not None:
+            self.stats[category]['size'] -= 1
 
-        # Determinar categoria
-        category = (
-            self.cache[oldest_key]['category']
-            if oldest_key in self.cache
-            else 'unknown'
-        )
+    def _evict_least_recently_used(self, index: int) -> None:
+        """Remove o item menos recentemente usado da maior categoria do shard"""
+        shard = self.shards[index]
+        if not shard:
+            return
 
-        await self._remove_item(oldest_key, category)
+        category, items = max(shard.items(), key=lambda x: len(x[1]))
+        if items:
+            items.popitem(last=False)
+            self.stats[category]['size'] -= 1
 
     async def _periodic_cleanup(self) -> None:
-        """Limpeza periódica de itens expirados"""
+        """Limpeza periódica de itens expirados, um shard por vez"""
         while True:
             try:
                 await asyncio.sleep(60)  # Executar a cada minuto
 
-                expired_keys = []
-                current_time = time.time()
-
-                async with self.lock:
-                    for full_key, cache_item in self.cache.items():
-                        if (
-                            current_time - cache_item['timestamp']
-                            > cache_item['ttl']
-                        ):
-                            expired_keys.append(
-                                (full_key, cache_item['category'])
-                            )
-
-                # Remover itens expirados
-                for full_key, category in expired_keys:
-                    async with self.lock:
-                        await self._remove_item(full_key, category)
-
-                if expired_keys:
-                    print(
-                        f'🧹 Cache: {len(expired_keys)} itens expirados removidos'
-                    )
+                removed = 0
+                now = time.monotonic()
+
+                for index, shard in enumerate(self.shards):
+                    # Detecta e remove os expirados numa única passada com o lock
+                    async with self.locks[index]:
+                        for category, items in shard.items():
+                            expired_keys = [
+                                key
+                                for key, cache_item in items.items()
+                                if cache_item['expires_at'] < now
+                            ]
+                            for key in expired_keys:
+                                self._remove_item_nolock(index, category, key)
+                            removed += len(expired_keys)
+
+                if removed:
+                    print(f'🧹 Cache: {removed} itens expirados removidos')
 
             except Exception as e:
                 print(f'⚠️ Erro na limpeza do cache: {e}')
@@ -220,31 +314,41 @@ class CacheManager:
         return (self.hit_count / total_requests) * 100
 
     def _estimate_memory_usage(self) -> Dict[str, Any]:
-        """Estima uso de memória do cache"""
+        """Estima uso de memória do cache (estimativa rasa dos valores)"""
         try:
             import sys
 
             total_size = 0
-            for key, item in self.cache.items():
-                total_size += sys.getsizeof(key)
-                total_size += sys.getsizeof(item)
-                if isinstance(item['data'], (dict, list)):
-                    total_size += sys.getsizeof(str(item['data']))
+            for shard in self.shards:
+                for items in shard.values():
+                    for key, item in items.items():
+                        total_size += sys.getsizeof(key)
+                        total_size += sys.getsizeof(item)
+                        # Tamanho raso: sem serializar cada valor a cada chamada
+                        total_size += sys.getsizeof(item['data'])
 
             return {
                 'estimated_bytes': total_size,
                 'estimated_mb': round(total_size / (1024 * 1024), 2),
-                'items_count': len(self.cache),
+                'items_count': self._size(),
             }
         except Exception:
             return {'error': 'Could not estimate memory usage'}
 
     async def close(self) -> None:
-        """Limpa o cache ao fechar"""
-        async with self.lock:
-            self.cache.clear()
-            self.access_times.clear()
-            self.stats.clear()
+        """Para a limpeza periódica e limpa o cache ao fechar"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+        for index in range(self.SHARD_COUNT):
+            async with self.locks[index]:
+                self.shards[index].clear()
+        self.stats.clear()
         print('🔧 Cache Manager finalizado')
 
 
@@ -329,19 +433,113 @@ class FinancialDataCache(CacheManager):
         for symbol in cryptos:
             await self.set(f'preload_{symbol}', True, 'metadata', 3600)
 
-    async def clear_all(self) -> None:
-        """Limpa todos os dados do cache"""
-        async with self.lock:
-            self.cache.clear()
-            self.access_times.clear()
-            
-            # Reset das estatísticas
-            self.hit_count = 0
-            self.miss_count = 0
-            
-            # Reset das estatísticas por categoria
-            for category in self.stats:
-                self.stats[category] = {'hits': 0, 'misses': 0, 'size': 0}
+
+# ================================
+# CACHE COMPARTILHADO ENTRE WORKERS (REDIS)
+# ================================
+
+
+class RedisCache:
+    """Cache de payloads JSON já serializados compartilhado via Redis
+
+    Com vários processos worker, o cache em memória de cada um fica
+    fragmentado; aqui os bytes prontos ficam no Redis e o hit vai direto para
+    a resposta HTTP. Falhas do Redis viram cache miss (a API segue buscando
+    nas fontes) e suspendem o uso por alguns segundos.
+    """
+
+    # TTLs (segundos) por família de chave
+    TTL_STOCK = 30
+    TTL_CRYPTO = 20
+    TTL_TRENDING = 15
+
+    RETRY_AFTER = 10
+
+    def __init__(self, url: str, prefix: str = 'vmpro:'):
+        import redis.asyncio as aioredis
+
+        self.prefix = prefix
+        self.client = aioredis.from_url(url)
+        self.hit_count = 0
+        self.miss_count = 0
+        self._retry_at = 0.0
+
+    @classmethod
+    def from_url(cls, url: Optional[str]) -> Optional['RedisCache']:
+        """Cria o cache se houver URL e o pacote redis estiver instalado"""
+        if not url:
+            return None
+        try:
+            return cls(url)
+        except ImportError:
+            print('⚠️ REDIS_URL definido, mas o pacote redis não está instalado')
+            return None
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, e: Exception) -> None:
+        print(f'⚠️ Redis indisponível: {e}')
+        self._retry_at = time.monotonic() + self.RETRY_AFTER
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Retorna os bytes em cache ou None"""
+        if not self._available():
+            return None
+        try:
+            payload = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self._failed(e)
+            return None
+
+        if payload is None:
+            self.miss_count += 1
+        else:
+            self.hit_count += 1
+        return payload
+
+    async def set(self, key: str, payload: bytes, ttl: int) -> None:
+        """Armazena bytes com expiração"""
+        if not self._available():
+            return
+        try:
+            await self.client.set(self.prefix + key, payload, ex=ttl)
+        except Exception as e:
+            self._failed(e)
+
+    async def clear(self, pattern: str = '*') -> int:
+        """Remove as chaves do prefixo via SCAN + DEL (sem bloquear com KEYS)"""
+        removed = 0
+        try:
+            batch = []
+            async for key in self.client.scan_iter(
+                match=self.prefix + pattern, count=500
+            ):
+                batch.append(key)
+                if len(batch) >= 500:
+                    removed += await self.client.delete(*batch)
+                    batch = []
+            if batch:
+                removed += await self.client.delete(*batch)
+        except Exception as e:
+            self._failed(e)
+        return removed
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas de uso (contadores deste processo)"""
+        total_requests = self.hit_count + self.miss_count
+        return {
+            'backend': 'redis',
+            'available': self._available(),
+            'hit_count': self.hit_count,
+            'miss_count': self.miss_count,
+            'hit_rate': (self.hit_count / total_requests) * 100
+            if total_requests
+            else 0.0,
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
 
 
 # Instância global do cache
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -11,6 +12,11 @@ from models.stock import Crypto
 # Cache para evitar muitas requisições
 requests_cache.install_cache('crypto_cache', expire_after=300)  # 5 minutos
 
+# Pool compartilhado para buscas em lote (I/O de rede libera o GIL)
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=16, thread_name_prefix='coingecko-fetch'
+)
+
 
 class CoinGeckoProvider(CryptoDataProvider):
     """Implementação usando CoinGecko API real com pycoingecko"""
@@ -82,10 +88,40 @@ class CoinGeckoProvider(CryptoDataProvider):
             return None
 
     def get_multiple_cryptos(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Busca dados de múltiplas criptomoedas"""
+        """Busca dados de múltiplas criptomoedas (uma chamada para os IDs conhecidos)"""
         result = {}
+        id_to_symbol = {}
+        unknown = []
         for symbol in symbols:
-            data = self.get_crypto_data(symbol)
+            crypto_id = self.symbol_to_id.get(symbol.upper())
+            if crypto_id:
+                id_to_symbol[crypto_id] = symbol.upper()
+            else:
+                unknown.append(symbol)
+
+        if id_to_symbol:
+            try:
+                coins = self.cg.get_coins_markets(
+                    vs_currency='usd',
+                    ids=','.join(id_to_symbol),
+                    per_page=len(id_to_symbol),
+                    page=1,
+                    sparkline=False,
+                    price_change_percentage='24h',
+                )
+                for coin in coins:
+                    symbol = id_to_symbol.get(coin.get('id'))
+                    if symbol:
+                        result[symbol] = self._coin_market_to_dict(
+                            coin, symbol
+                        )
+            except Exception as e:
+                print(f'Erro ao buscar criptos em lote: {e}')
+
+        # Símbolos sem ID mapeado exigem busca individual
+        for symbol, data in zip(
+            unknown, _fetch_executor.map(self.get_crypto_data, unknown)
+        ):
             if data:
                 result[symbol.upper()] = data
         return result
@@ -103,37 +139,39 @@ class CoinGeckoProvider(CryptoDataProvider):
                 price_change_percentage='24h',
             )
 
-            result = []
-            for coin in coins:
-                current_price = coin.get('current_price', 0)
-                price_change_24h = coin.get('price_change_percentage_24h', 0)
-
-                if price_change_24h != 0:
-                    previous_price = current_price / (
-                        1 + (price_change_24h / 100)
-                    )
-                else:
-                    previous_price = current_price
-
-                result.append(
-                    {
-                        'symbol': coin.get('symbol', '').upper(),
-                        'name': coin.get('name', ''),
-                        'price': current_price,
-                        'previous_close': previous_price,
-                        'market_cap': coin.get('market_cap'),
-                        'volume_24h': coin.get('total_volume'),
-                        'change_percent_24h': price_change_24h,
-                        'last_updated': datetime.now(),
-                    }
+            return [
+                self._coin_market_to_dict(
+                    coin, coin.get('symbol', '').upper()
                 )
-
-            return result
+                for coin in coins
+            ]
 
         except Exception as e:
             print(f'Erro ao buscar criptos em alta: {e}')
             return []
 
+    @staticmethod
+    def _coin_market_to_dict(coin: Dict, symbol: str) -> Dict:
+        """Converte um item de /coins/markets para o formato do provider"""
+        current_price = coin.get('current_price') or 0
+        price_change_24h = coin.get('price_change_percentage_24h') or 0
+
+        if price_change_24h != 0:
+            previous_price = current_price / (1 + (price_change_24h / 100))
+        else:
+            previous_price = current_price
+
+        return {
+            'symbol': symbol,
+            'name': coin.get('name', ''),
+            'price': current_price,
+            'previous_close': previous_price,
+            'market_cap': coin.get('market_cap'),
+            'volume_24h': coin.get('total_volume'),
+            'change_percent_24h': price_change_24h,
+            'last_updated': datetime.now(),
+        }
+
 
 class MockCryptoProvider(CryptoDataProvider):
     """Implementação mock para testes e desenvolvimento"""
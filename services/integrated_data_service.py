@@ -1,16 +1,26 @@
+import functools
+from dataclasses import replace
 from datetime import datetime
 from typing import Dict, List, Optional
 
 import yfinance as yf
 
 from models.stock import Stock
-from services.localization_service import (CurrencyService,
-                                           LocalizationService,
+from services.localization_service import (LocalizationService,
                                            PeriodFilterService,
                                            StockRegionService)
 from utils.config import Config
 
 
+@functools.cache
+def get_crypto_tracker():
+    """TrackerService de criptos compartilhado, criado no primeiro uso"""
+    from services.crypto_data_service import CoinGeckoProvider
+    from services.tracker_service import TrackerService
+
+    return TrackerService(None, CoinGeckoProvider())
+
+
 class IntegratedStockService:
     """Serviço integrado de dados de ações com filtros de região, período e localização"""
 
@@ -18,13 +28,8 @@ class IntegratedStockService:
         self.localization_service = LocalizationService()
         self.region_service = StockRegionService()
         self.period_service = PeriodFilterService()
-        self.currency_service = CurrencyService()
-
-        # Atualizar taxa de câmbio
-        try:
-            self.currency_service.update_exchange_rate()
-        except Exception as e:
-            print(f'Erro ao atualizar taxa de câmbio: {e}')
+        # Reaproveita o CurrencyService (e a taxa já buscada) da localização
+        self.currency_service = self.localization_service.currency_service
 
     def get_stock_data_with_filters(
         self, symbol: str, period: str = '3m', currency: str = 'USD'
@@ -347,25 +352,23 @@ class IntegratedStockService:
         """Retorna lista de criptomoedas em alta com filtros e metadados"""
         try:
             # Para esta implementação, vamos usar os métodos existentes do tracker service
-            from services.crypto_data_service import CoinGeckoProvider
-            from services.tracker_service import TrackerService
-
-            crypto_provider = CoinGeckoProvider()
-            tracker = TrackerService(None, crypto_provider)
-
-            cryptos = tracker.get_trending_cryptos(limit)
+            cryptos = get_crypto_tracker().get_trending_cryptos(limit)
 
             # Converter preços se necessário
             if currency == 'BRL' and cryptos:
                 exchange_rate = self.localization_service.get_exchange_rate(
                     'USD', 'BRL'
                 )
-                for crypto in cryptos:
-                    crypto.price = crypto.price * exchange_rate
-                    if crypto.change_amount:
-                        crypto.change_amount = (
-                            crypto.change_amount * exchange_rate
-                        )
+                # Crypto é imutável: gera cópias com preços convertidos
+                # (change_amount acompanha a conversão de ambos os preços)
+                cryptos = [
+                    replace(
+                        crypto,
+                        price=crypto.price * exchange_rate,
+                        previous_close=crypto.previous_close * exchange_rate,
+                    )
+                    for crypto in cryptos
+                ]
 
             filters_applied = {
                 'period': period,
@@ -5,12 +5,59 @@ from typing import Any, Dict
 
 import requests
 import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from utils.config import Config
 
 # Cache para conversão de moedas
 requests_cache.install_cache('currency_cache', expire_after=3600)  # 1 hora
 
+# Sessão HTTP compartilhada: reaproveita conexões keep-alive (TCP/TLS)
+_http_session = requests.Session()
+_http_session.mount(
+    'https://',
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+        ),
+    ),
+)
+
+# Separadores pt-BR: troca ',' <-> '.' em uma única passada
+_BRL_SEPARATORS = str.maketrans({',': '.', '.': ','})
+
+# Opções estáticas de localização, montadas uma única vez
+AVAILABLE_CURRENCIES = (
+    {'value': 'USD', 'label': 'USD - US Dollar', 'flag': '🇺🇸'},
+    {'value': 'BRL', 'label': 'BRL - Real Brasileiro', 'flag': '🇧🇷'},
+)
+
+AVAILABLE_LANGUAGES = (
+    {'value': 'pt-BR', 'label': 'Português', 'flag': '🇧🇷'},
+    {'value': 'en-US', 'label': 'English', 'flag': '🇺🇸'},
+)
+
+AVAILABLE_REGIONS = (
+    {'value': 'all', 'label': 'Todas as Regiões'},
+    {'value': 'BR', 'label': 'Brasil', 'flag': '🇧🇷'},
+    {'value': 'US', 'label': 'Estados Unidos', 'flag': '🇺🇸'},
+)
+
+AVAILABLE_PERIODS = (
+    {'value': '1D', 'label': '1 Dia'},
+    {'value': '5D', 'label': '5 Dias'},
+    {'value': '1M', 'label': '1 Mês'},
+    {'value': '3M', 'label': '3 Meses'},
+    {'value': '6M', 'label': '6 Meses'},
+    {'value': '9M', 'label': '9 Meses'},
+    {'value': '12M', 'label': '12 Meses'},
+)
+
 
 class CurrencyService:
     """Serviço para conversão de moedas"""
@@ -26,7 +73,7 @@ class CurrencyService:
         """Atualiza taxa de câmbio via API externa"""
         try:
             # Usando API gratuita para taxas de câmbio
-            response = requests.get(
+            response = _http_session.get(
                 'https://api.exchangerate-api.com/v4/latest/USD', timeout=5
             )
             if response.status_code == 200:
@@ -57,11 +104,7 @@ class CurrencyService:
     def format_currency(self, amount: float, currency: str) -> str:
         """Formata valor com símbolo da moeda"""
         if currency == 'BRL':
-            return (
-                f'R$ {amount:,.2f}'.replace(',', 'X')
-                .replace('.', ',')
-                .replace('X', '.')
-            )
+            return 'R$ ' + f'{amount:,.2f}'.translate(_BRL_SEPARATORS)
         else:  # USD
             return f'${amount:,.2f}'
 
@@ -195,37 +238,19 @@ class LocalizationService:
 
     def get_available_currencies(self) -> list:
         """Retorna lista de moedas disponíveis"""
-        return [
-            {'value': 'USD', 'label': 'USD - US Dollar', 'flag': '🇺🇸'},
-            {'value': 'BRL', 'label': 'BRL - Real Brasileiro', 'flag': '🇧🇷'},
-        ]
+        return list(AVAILABLE_CURRENCIES)
 
     def get_available_languages(self) -> list:
         """Retorna lista de idiomas disponíveis"""
-        return [
-            {'value': 'pt-BR', 'label': 'Português', 'flag': '🇧🇷'},
-            {'value': 'en-US', 'label': 'English', 'flag': '🇺🇸'},
-        ]
+        return list(AVAILABLE_LANGUAGES)
 
     def get_available_regions(self) -> list:
         """Retorna lista de regiões disponíveis"""
-        return [
-            {'value': 'all', 'label': 'Todas as Regiões'},
-            {'value': 'BR', 'label': 'Brasil', 'flag': '🇧🇷'},
-            {'value': 'US', 'label': 'Estados Unidos', 'flag': '🇺🇸'},
-        ]
+        return list(AVAILABLE_REGIONS)
 
     def get_available_periods(self) -> list:
         """Retorna lista de períodos disponíveis"""
-        return [
-            {'value': '1D', 'label': '1 Dia'},
-            {'value': '5D', 'label': '5 Dias'},
-            {'value': '1M', 'label': '1 Mês'},
-            {'value': '3M', 'label': '3 Meses'},
-            {'value': '6M', 'label': '6 Meses'},
-            {'value': '9M', 'label': '9 Meses'},
-            {'value': '12M', 'label': '12 Meses'},
-        ]
+        return list(AVAILABLE_PERIODS)
 
     def translate(self, text: str, language: str = 'pt-BR') -> str:
         """Traduz um texto para o idioma especificado"""
@@ -4,6 +4,7 @@ Segue princípios SOLID: Single Responsibility e Dependency Injection
 """
 import asyncio
 import time
+from collections import deque
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass
@@ -15,6 +16,14 @@ from interfaces.service_interfaces import (
 )
 
 
+class CircuitOpenError(Exception):
+    """Lançada quando o circuit breaker de um serviço está aberto"""
+    
+    def __init__(self, service_name: str):
+        super().__init__(f"Circuit breaker is open for {service_name}")
+        self.service_name = service_name
+
+
 @dataclass
 class ServiceMetrics:
     """Métricas de um serviço"""
@@ -65,44 +74,44 @@ class ResponseFormatter(IResponseFormatter):
 
 
 class MemoryRateLimiter(IRateLimiter):
-    """Implementação simples de rate limiter em memória"""
+    """Implementação simples de rate limiter em memória (janela deslizante)"""
     
     def __init__(self):
-        self.requests = {}
+        self.requests: Dict[str | bytes, deque] = {}
     
-    async def is_allowed(self, key: str, limit: int, window: int) -> bool:
+    @staticmethod
+    def _prune(timestamps: deque, cutoff: float) -> None:
+        # Timestamps são inseridos em ordem, então os expirados ficam no início
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+    
+    async def is_allowed(self, key: str | bytes, limit: int, window: int) -> bool:
         current_time = time.time()
         
-        if key not in self.requests:
-            self.requests[key] = []
+        timestamps = self.requests.get(key)
+        if timestamps is None:
+            timestamps = self.requests[key] = deque()
         
-        # Remove requisições antigas
-        self.requests[key] = [
-            req_time for req_time in self.requests[key]
-            if current_time - req_time < window
-        ]
+        # Remove requisições antigas, conta e registra em uma única passagem
+        self._prune(timestamps, current_time - window)
         
-        if len(self.requests[key]) < limit:
-            self.requests[key].append(current_time)
+        if len(timestamps) < limit:
+            timestamps.append(current_time)
             return True
         
         return False
     
-    async def get_remaining(self, key: str, limit: int, window: int) -> int:
-        current_time = time.time()
+    async def get_remaining(self, key: str | bytes, limit: int, window: int) -> int:
+        timestamps = self.requests.get(key)
         
-        if key not in self.requests:
+        if timestamps is None:
             return limit
         
-        # Remove requisições antigas
-        valid_requests = [
-            req_time for req_time in self.requests[key]
-            if current_time - req_time < window
-        ]
+        self._prune(timestamps, time.time() - window)
         
-        return max(0, limit - len(valid_requests))
+        return max(0, limit - len(timestamps))
     
-    async def reset(self, key: str) -> bool:
+    async def reset(self, key: str | bytes) -> bool:
         if key in self.requests:
             del self.requests[key]
             return True
@@ -240,6 +249,16 @@ class ServiceManager:
         return self._health_checker
     
     # Circuit Breaker Pattern
+    def check_circuit(self, service_name: str) -> None:
+        """Falha imediatamente, sem await, se o circuit breaker estiver aberto"""
+        circuit = self._circuit_breakers.get(service_name)
+        if (
+            circuit is not None
+            and circuit["state"] == "open"
+            and time.time() - circuit["last_failure_time"] <= circuit["timeout"]
+        ):
+            raise CircuitOpenError(service_name)
+    
     async def _execute_with_circuit_breaker(self, service_name: str, operation, *args, **kwargs):
         """Executa operação com circuit breaker"""
         circuit = self._circuit_breakers.get(service_name, {
@@ -256,7 +275,7 @@ class ServiceManager:
                 circuit["state"] = "half_open"
                 circuit["failure_count"] = 0
             else:
-                raise Exception(f"Circuit breaker is open for {service_name}")
+                raise CircuitOpenError(service_name)
         
         try:
             start_time = time.time()
@@ -45,7 +45,7 @@ class ServiceOrchestrator:
             await self.cache_manager.initialize()
             self.logger.info("Service Orchestrator initialized successfully")
         except Exception as e:
-            self.logger.error(f"Error initializing Service Orchestrator: {e}")
+            self.logger.error("Error initializing Service Orchestrator: %s", e)
             raise
     
     # ============== STOCK OPERATIONS ==============
@@ -79,7 +79,7 @@ class ServiceOrchestrator:
                 return self.fallback_service.get_sample_stock_data(symbol)
                 
         except Exception as e:
-            self.logger.error(f"Error getting stock data for {symbol}: {e}")
+            self.logger.error("Error getting stock data for %s: %s", symbol, e)
             self.metrics['errors'] += 1
             # Em caso de erro, usar fallback
             return self.fallback_service.get_sample_stock_data(symbol)
@@ -116,7 +116,7 @@ class ServiceOrchestrator:
                 return fallback_data
                 
         except Exception as e:
-            self.logger.error(f"Error getting trending stocks: {e}")
+            self.logger.error("Error getting trending stocks: %s", e)
             self.metrics['errors'] += 1
             # Em caso de erro, usar fallback
             return self.fallback_service.get_sample_trending_stocks(region, limit)
@@ -151,7 +151,7 @@ class ServiceOrchestrator:
                 return self.fallback_service.get_sample_crypto_data(symbol)
                 
         except Exception as e:
-            self.logger.error(f"Error getting crypto data for {symbol}: {e}")
+            self.logger.error("Error getting crypto data for %s: %s", symbol, e)
             self.metrics['errors'] += 1
             # Em caso de erro, usar fallback
             return self.fallback_service.get_sample_crypto_data(symbol)
@@ -188,7 +188,7 @@ class ServiceOrchestrator:
                 return fallback_data
                 
         except Exception as e:
-            self.logger.error(f"Error getting trending cryptos: {e}")
+            self.logger.error("Error getting trending cryptos: %s", e)
             self.metrics['errors'] += 1
             # Em caso de erro, usar fallback
             return self.fallback_service.get_sample_trending_cryptos(limit, order_by)
@@ -211,7 +211,7 @@ class ServiceOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
         except Exception as e:
-            self.logger.error(f"Error clearing caches: {e}")
+            self.logger.error("Error clearing caches: %s", e)
             return {
                 'success': False,
                 'message': f'Erro ao limpar caches: {str(e)}',
@@ -236,7 +236,7 @@ class ServiceOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
         except Exception as e:
-            self.logger.error(f"Error getting system metrics: {e}")
+            self.logger.error("Error getting system metrics: %s", e)
             return {
                 'error': f'Erro ao obter métricas: {str(e)}',
                 'timestamp': datetime.now().isoformat()
@@ -272,7 +272,7 @@ class ServiceOrchestrator:
                 health_status['status'] = 'degraded'
             
         except Exception as e:
-            self.logger.error(f"Error in health check: {e}")
+            self.logger.error("Error in health check: %s", e)
             health_status['status'] = 'unhealthy'
             health_status['error'] = str(e)
         
@@ -1,4 +1,5 @@
 # filepath: /home/synev1/dev/vmpro/app/stock-tracker/src/services/stock_data_service.py
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -11,6 +12,11 @@ from models.stock import Stock
 # Cache para evitar muitas requisições
 requests_cache.install_cache('stock_cache', expire_after=300)  # 5 minutos
 
+# Pool compartilhado para buscas em lote (I/O de rede libera o GIL)
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=16, thread_name_prefix='yahoo-fetch'
+)
+
 
 class YahooFinanceProvider(DataProvider):
     """Implementação usando Yahoo Finance API real com yfinance"""
@@ -57,10 +63,11 @@ class YahooFinanceProvider(DataProvider):
             return None
 
     def get_multiple_stocks(self, symbols: List[str]) -> Dict[str, Dict]:
-        """Busca dados de múltiplas ações"""
+        """Busca dados de múltiplas ações em paralelo"""
         result = {}
-        for symbol in symbols:
-            data = self.get_stock_data(symbol)
+        for symbol, data in zip(
+            symbols, _fetch_executor.map(self.get_stock_data, symbols)
+        ):
             if data:
                 result[symbol.upper()] = data
         return result
@@ -81,10 +88,12 @@ class YahooFinanceProvider(DataProvider):
                 'JPM',
             ]
             stocks_data = []
+            symbols = popular_stocks[:limit]
 
-            for symbol in popular_stocks[:limit]:
+            for symbol, data in zip(
+                symbols, _fetch_executor.map(self.get_stock_data, symbols)
+            ):
                 try:
-                    data = self.get_stock_data(symbol)
                     if data and data['previous_close'] > 0:
                         change_percent = (
                             (data['price'] - data['previous_close'])
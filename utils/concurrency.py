@@ -0,0 +1,123 @@
+"""
+Utilitários de Concorrência
+Coalescência de chamadas assíncronas concorrentes (single-flight)
+e cache assíncrono em memória com TTL
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Agrupa chamadas concorrentes com a mesma chave em uma única execução"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Executa factory() uma vez por chave; chamadas simultâneas aguardam o mesmo resultado"""
+        task = self._inflight.get(key)
+        if task is None:
+            # factory() roda em task própria: não pertence a nenhum request
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        # shield: o cancelamento de quem espera (líder ou seguidor) não
+        # cancela a chamada compartilhada
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Marca a exceção como consumida caso ninguém mais esteja aguardando
+        if not task.cancelled():
+            task.exception()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class AsyncTTLCache:
+    """Cache LRU em memória com TTL para resultados de corrotinas
+
+    Com stale_ttl > 0 (stale-while-revalidate), um valor expirado há menos de
+    stale_ttl segundos ainda é devolvido imediatamente enquanto uma recarga
+    roda em segundo plano.
+    """
+
+    def __init__(self, maxsize: int = 32, ttl: float = 60, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # chave -> (expiração monotônica, valor)
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get_or_load(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Retorna o valor em cache ou executa factory() (uma vez por chave) e armazena"""
+        item = self._items.get(key)
+        if item is not None:
+            expires_at, value = item
+            now = time.monotonic()
+            if expires_at > now:
+                self._items.move_to_end(key)
+                return value
+            if expires_at + self.stale_ttl > now:
+                self._items.move_to_end(key)
+                self._revalidate(key, factory)
+                return value
+            del self._items[key]
+
+        return await self._inflight.do(key, lambda: self._load(key, factory))
+
+    def _revalidate(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> None:
+        """Agenda uma recarga em segundo plano, se ainda não houver uma em curso"""
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._background_refresh(key, factory))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _background_refresh(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> None:
+        try:
+            await self.refresh(key, factory)
+        except Exception as e:
+            # Mantém o valor antigo; a próxima leitura tenta de novo
+            logger.warning("Falha ao revalidar cache %r: %s", key, e)
+
+    async def refresh(
+        self, key: Hashable, factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Recarrega a chave ignorando o valor em cache (aquecimento em segundo plano)"""
+        return await self._inflight.do(key, lambda: self._load(key, factory))
+
+    async def _load(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        value = await factory()
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
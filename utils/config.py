@@ -89,20 +89,34 @@ class Config:
     # Rate limiting
     API_RATE_LIMIT = 60  # requests per minute
 
+    # Ambiente: em produção debug/reload ficam sempre desligados
+    ENVIRONMENT = os.getenv('ENVIRONMENT', 'development').lower()
+    IS_PRODUCTION = ENVIRONMENT == 'production'
+
     # Flask settings
     FLASK_HOST = os.getenv('FLASK_HOST', '0.0.0.0')
     FLASK_PORT = int(os.getenv('FLASK_PORT', 5000))
-    FLASK_DEBUG = os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
+    FLASK_DEBUG = (
+        not IS_PRODUCTION
+        and os.getenv('FLASK_DEBUG', 'true').lower() == 'true'
+    )
 
     # FastAPI settings
     FASTAPI_HOST = os.getenv('FASTAPI_HOST', '0.0.0.0')
     FASTAPI_PORT = int(os.getenv('FASTAPI_PORT', 8000))
-    FASTAPI_RELOAD = os.getenv('FASTAPI_RELOAD', 'true').lower() == 'true'
+    FASTAPI_RELOAD = (
+        not IS_PRODUCTION
+        and os.getenv('FASTAPI_RELOAD', 'true').lower() == 'true'
+    )
+    FASTAPI_WORKERS = int(os.getenv('FASTAPI_WORKERS', os.cpu_count() or 1))
 
     # Performance settings
     CACHE_TTL_STOCKS = int(os.getenv('CACHE_TTL_STOCKS', 300))  # 5 minutos
     CACHE_TTL_CRYPTO = int(os.getenv('CACHE_TTL_CRYPTO', 180))  # 3 minutos
+    # Cache compartilhado entre workers (opcional, ex: redis://redis:6379/0)
+    REDIS_URL = os.getenv('REDIS_URL')
     MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 10))
+    REQUEST_TIMEOUT = int(os.getenv('REQUEST_TIMEOUT', 30))  # segundos
 
     # API Rate Limiting
     REQUESTS_PER_MINUTE = int(os.getenv('REQUESTS_PER_MINUTE', 60))
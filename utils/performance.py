@@ -418,5 +418,17 @@ def monitor_performance(endpoint_name: str = None):
     return decorator
 
 
+_iso_clock = {'second': -1, 'iso': ''}
+
+
+def iso_now() -> str:
+    """Timestamp ISO-8601 (hora local, resolução de segundos) recalculado no máximo 1x/s"""
+    second = int(time.time())
+    if second != _iso_clock['second']:
+        _iso_clock['iso'] = datetime.fromtimestamp(second).isoformat()
+        _iso_clock['second'] = second
+    return _iso_clock['iso']
+
+
 # Instância global do monitor
 performance_monitor = PerformanceMonitor()
@@ -0,0 +1,46 @@
+"""
+Serialização JSON
+Opções do orjson e handler de tipos extras definidos uma única vez e
+compartilhados pelas respostas da API
+"""
+
+from dataclasses import asdict, is_dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# Dataclasses passam pelo _default para usar o to_dict() dos modelos
+# (inclui change_amount/is_gaining, que são properties)
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+    | orjson.OPT_UTC_Z
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+def _default(obj: Any) -> Any:
+    """Converte tipos que o orjson não serializa nativamente"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        to_dict = getattr(obj, 'to_dict', None)
+        return to_dict() if to_dict is not None else asdict(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f'Tipo não serializável: {type(obj).__name__}')
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa para bytes JSON com as opções compartilhadas"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse com as opções e o handler compartilhados"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
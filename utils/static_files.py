@@ -0,0 +1,101 @@
+"""
+Arquivos Estáticos Pré-comprimidos
+Serve irmãos .gz gerados uma vez, em vez de comprimir a cada request
+"""
+
+import gzip
+import mimetypes
+import os
+import tempfile
+from typing import Iterable
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.txt')
+
+
+def precompress_directory(
+    directory: str, extensions: Iterable[str] = COMPRESSIBLE_EXTENSIONS
+) -> int:
+    """Gera/atualiza os .gz dos arquivos compressíveis; retorna quantos foram escritos"""
+    extensions = tuple(extensions)
+    written = 0
+
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(extensions):
+                continue
+
+            source = os.path.join(root, name)
+            target = source + '.gz'
+            if (
+                os.path.exists(target)
+                and os.path.getmtime(target) >= os.path.getmtime(source)
+            ):
+                continue
+
+            with open(source, 'rb') as f:
+                data = f.read()
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            # Arquivos muito pequenos não ganham nada comprimidos
+            if len(compressed) >= len(data):
+                continue
+
+            # Escreve num temporário ao lado e troca de uma vez: workers
+            # servindo o .gz nunca veem um arquivo pela metade
+            fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(compressed)
+                # mkstemp cria com 0600; o .gz herda as permissões do original
+                os.chmod(tmp_path, os.stat(source).st_mode & 0o777)
+                os.replace(tmp_path, target)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            written += 1
+
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que responde com o irmão .gz quando o cliente aceita gzip
+
+    Com Content-Encoding já definido, o GZipMiddleware não recomprime.
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+
+        if 'gzip' in request_headers.get('accept-encoding', ''):
+            gz_path = f'{full_path}.gz'
+            try:
+                gz_stat = os.stat(gz_path)
+            except OSError:
+                gz_stat = None
+
+            if gz_stat is not None and gz_stat.st_mtime >= stat_result.st_mtime:
+                media_type = mimetypes.guess_type(str(full_path))[0] or 'text/plain'
+                response = FileResponse(
+                    gz_path,
+                    status_code=status_code,
+                    stat_result=gz_stat,
+                    media_type=media_type,
+                    headers={
+                        'content-encoding': 'gzip',
+                        'vary': 'Accept-Encoding',
+                    },
+                )
+                if self.is_not_modified(response.headers, request_headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+
+        return super().file_response(full_path, stat_result, scope, status_code)